@@ -21,7 +21,8 @@ public class KeywordStatsController {
             String cameraModel,
             String sentimentLabel,
             String keyword,
-            int freq
+            int freq,
+            Double score
     ) {}
 
     @GetMapping("/keywords")
@@ -46,7 +47,8 @@ public class KeywordStatsController {
                         k.getCameraModel(),
                         k.getSentimentLabel(),
                         k.getKeyword(),
-                        k.getFreq() == null ? 0 : k.getFreq()
+                        k.getFreq() == null ? 0 : k.getFreq(),
+                        k.getScore()
                 ))
                 .toList();
     }
@@ -23,6 +23,9 @@ public class ReviewKeywordStat {
     @Column(nullable = false)
     private Integer freq;
 
+    @Column
+    private Double score;
+
     @Column(name = "updated_at", nullable = false)
     private LocalDateTime updatedAt;
 
@@ -65,6 +68,14 @@ public class ReviewKeywordStat {
         this.freq = freq;
     }
 
+    public Double getScore() {
+        return score;
+    }
+
+    public void setScore(Double score) {
+        this.score = score;
+    }
+
     public LocalDateTime getUpdatedAt() {
         return updatedAt;
     }
@@ -14,7 +14,7 @@ public interface ReviewKeywordStatRepo extends JpaRepository<ReviewKeywordStat,
         SELECT k FROM ReviewKeywordStat k
         WHERE (:camera IS NULL OR :camera = '' OR k.cameraModel = :camera)
           AND (:sentiment IS NULL OR :sentiment = '' OR k.sentimentLabel = :sentiment)
-        ORDER BY k.freq DESC
+        ORDER BY k.score DESC NULLS LAST, k.freq DESC
         """)
     Page<ReviewKeywordStat> findByFilters(
             @Param("camera") String camera,
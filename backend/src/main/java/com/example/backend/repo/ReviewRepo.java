@@ -26,53 +26,70 @@ public interface ReviewRepo extends JpaRepository<Review, Long> {
     """)
     Page<Review> search(String sentiment, String camera, String query, Pageable pageable);
 
-    // ====== 통계용: 전체/카메라별 감성 분포 ======
-    @Query("""
-        SELECT r.sentimentLabel AS label, COUNT(r) AS cnt
-          FROM Review r
-         WHERE (:camera IS NULL OR :camera = '' OR r.cameraModel = :camera)
-         GROUP BY r.sentimentLabel
-    """)
+    // ====== 통계용 ======
+    //  review 전체를 GROUP BY 하지 않고 (카메라, 날짜) 요약 테이블 camera_sentiment_summary 를 읽음
+    //  (review 트리거로 유지, db-init/014_camera_sentiment_summary.sql)
+    //  → 비용이 리뷰 수가 아니라 카메라 × 날짜 수에 비례
+
+    // 전체/카메라별 감성 분포 (라벨이 없는 리뷰는 label = NULL)
+    @Query(value = """
+        SELECT v.label, v.cnt
+          FROM (
+                SELECT CAST(COALESCE(SUM(s.positive_count), 0)  AS BIGINT) AS positive_count,
+                       CAST(COALESCE(SUM(s.neutral_count), 0)   AS BIGINT) AS neutral_count,
+                       CAST(COALESCE(SUM(s.negative_count), 0)  AS BIGINT) AS negative_count,
+                       CAST(COALESCE(SUM(s.unlabeled_count), 0) AS BIGINT) AS unlabeled_count
+                  FROM camera_sentiment_summary s
+                 WHERE (CAST(:camera AS TEXT) IS NULL OR CAST(:camera AS TEXT) = '' OR s.camera_model = :camera)
+               ) t
+         CROSS JOIN LATERAL (
+                VALUES ('positive', t.positive_count),
+                       ('neutral',  t.neutral_count),
+                       ('negative', t.negative_count),
+                       (NULL,       t.unlabeled_count)
+               ) AS v(label, cnt)
+         WHERE v.cnt > 0
+    """, nativeQuery = true)
     List<Object[]> countBySentimentGroup(String camera);
 
-    // ====== 통계용: 평균 감성 점수 (전체/카메라별) ======
-    @Query("""
-        SELECT COALESCE(AVG(r.sentimentScore), 0)
-          FROM Review r
-         WHERE (:camera IS NULL OR :camera = '' OR r.cameraModel = :camera)
-    """)
+    // 평균 감성 점수 (전체/카메라별)
+    @Query(value = """
+        SELECT CAST(COALESCE(SUM(s.score_sum) / NULLIF(SUM(s.scored_count), 0), 0) AS DOUBLE PRECISION)
+          FROM camera_sentiment_summary s
+         WHERE (CAST(:camera AS TEXT) IS NULL OR CAST(:camera AS TEXT) = '' OR s.camera_model = :camera)
+    """, nativeQuery = true)
     Double findAvgSentimentScoreByCamera(String camera);
 
-    // ====== 통계용: 리뷰 개수 (전체/카메라별) ======
-    @Query("""
-        SELECT COUNT(r)
-          FROM Review r
-         WHERE (:camera IS NULL OR :camera = '' OR r.cameraModel = :camera)
-    """)
+    // 리뷰 개수 (전체/카메라별)
+    @Query(value = """
+        SELECT CAST(COALESCE(SUM(s.review_count), 0) AS BIGINT)
+          FROM camera_sentiment_summary s
+         WHERE (CAST(:camera AS TEXT) IS NULL OR CAST(:camera AS TEXT) = '' OR s.camera_model = :camera)
+    """, nativeQuery = true)
     Long countByCamera(String camera);
 
     // 카메라 기종 목록 (드롭다운용)
-    @Query("""
-        SELECT DISTINCT r.cameraModel
-          FROM Review r
-         WHERE r.cameraModel IS NOT NULL
-           AND TRIM(r.cameraModel) <> ''
-         ORDER BY r.cameraModel
-    """)
+    @Query(value = """
+        SELECT s.camera_model
+          FROM camera_sentiment_summary s
+         WHERE TRIM(s.camera_model) <> ''
+         GROUP BY s.camera_model
+        HAVING SUM(s.review_count) > 0
+         ORDER BY s.camera_model
+    """, nativeQuery = true)
     List<String> findDistinctCameraModels();
 
-    // 카메라별 평균 감성 점수 랭킹 (리뷰 개수 minCount 이상인 것만)
-    @Query("""
-        SELECT r.cameraModel AS camera,
-               COUNT(r) AS cnt,
-               COALESCE(AVG(r.sentimentScore), 0)
-          FROM Review r
-         WHERE r.cameraModel IS NOT NULL
-           AND TRIM(r.cameraModel) <> ''
-           AND r.sentimentScore IS NOT NULL
-         GROUP BY r.cameraModel
-         HAVING COUNT(r) >= :minCount
-         ORDER BY COALESCE(AVG(r.sentimentScore), 0) DESC
-    """)
+    // 카메라별 평균 감성 점수 랭킹 (감성 점수가 있는 리뷰 개수 minCount 이상인 것만)
+    @Query(value = """
+        SELECT s.camera_model AS camera,
+               CAST(SUM(s.scored_count) AS BIGINT) AS cnt,
+               CAST(SUM(s.score_sum) / SUM(s.scored_count) AS DOUBLE PRECISION) AS avg_score
+          FROM camera_sentiment_summary s
+         WHERE TRIM(s.camera_model) <> ''
+         GROUP BY s.camera_model
+        HAVING SUM(s.scored_count) > 0
+           AND SUM(s.scored_count) >= :minCount
+         ORDER BY avg_score DESC
+    """, nativeQuery = true)
     List<Object[]> findCameraRanking(int minCount);
 }
\ No newline at end of file
@@ -9,6 +9,17 @@ camera_list.json 파일에 정의된 여러 카메라 기종에 대해
   cd datapipe
   source .venv/bin/activate
   python batch_crawl_cameras.py
+  python batch_crawl_cameras.py --workers 8              # job 8개 동시 실행
+  python batch_crawl_cameras.py --batch-id nightly-0131  # 중단된 배치 이어서 실행
+  python batch_crawl_cameras.py --restart                # 같은 batch_id 라도 처음부터
+
+job 스케줄링 (crawl_scheduler.py):
+  - 카메라 1개 = job 1개, worker 스레드로 동시에 실행 (CRAWL_JOB_WORKERS, 기본 4)
+  - priority 가 높은 카메라부터 시작, 실패하면 backoff 후 재시도
+  - YouTube quota 는 모든 job 이 공유 (YOUTUBE_DAILY_QUOTA), 소진되면 남은 job 은 다음 실행으로
+  - job 상태는 crawl_job_status 테이블에 기록, batch_id(기본: 오늘 날짜)가 같으면 완료된 job 은 건너뜀
+  - --concurrent 여도 job 단위 스케줄링은 같고, job 안의 비디오를 asyncio 로 동시에 수집
+    (youtube_async.AsyncJobRunner, 모든 job 이 하나의 rate limiter 공유)
 
 사전 준비:
   - YOUTUBE_API_KEY 환경변수 설정 필요
@@ -25,21 +36,31 @@ camera_list.json 파일에 정의된 여러 카메라 기종에 대해
         },
         {
           "camera": "Sony A7 IV",
-          "query": "소니 A7M4 리뷰"
+          "query": "소니 A7M4 리뷰",
+          "priority": 10
         }
       ]
     }
 
     → max_videos / comments_per_video 가 없으면 기본값 3 / 40 사용
+    → priority 는 클수록 먼저 실행 (기본 0, 신제품에 높은 값)
 """
 
 from dataclasses import dataclass
-from typing import List
+from datetime import date
+from functools import partial
+from typing import Callable, List, Optional
 from pathlib import Path
+import argparse
 import json
+import os
 
 # 기존 크롤러의 main 함수를 재사용
-from crawl_youtube_comments import main as crawl_main
+from crawl_youtube_comments import get_youtube, main as crawl_main
+from crawl_scheduler import JOB_WORKERS, JobScheduler
+from db import get_engine
+from review_partitions import ensure_partitions
+from youtube_quota import QuotaBudget, set_budget
 
 
 @dataclass
@@ -48,6 +69,7 @@ class CameraJob:
     query: str            # 유튜브 검색어
     max_videos: int = 5   # 검색해서 처리할 최대 비디오 수
     comments_per_video: int = 100  # 비디오당 최대 댓글 수
+    priority: int = 0     # 클수록 먼저 실행
 
 
 def load_camera_jobs() -> List[CameraJob]:
@@ -77,6 +99,7 @@ def load_camera_jobs() -> List[CameraJob]:
 
         max_videos = int(item.get("max_videos", 8))
         comments_per_video = int(item.get("comments_per_video", 80))
+        priority = int(item.get("priority", 0))
 
         jobs.append(
             CameraJob(
@@ -84,46 +107,144 @@ def load_camera_jobs() -> List[CameraJob]:
                 query=query,
                 max_videos=max_videos,
                 comments_per_video=comments_per_video,
+                priority=priority,
             )
         )
 
     return jobs
 
 
-def run_batch():
+def crawl_job(
+    job: CameraJob,
+    full_recrawl: bool = False,
+    on_inserted: Optional[Callable[[List[int]], None]] = None,
+    progress: bool = True,
+) -> int:
+    """CameraJob 1개 크롤링 → 삽입된 리뷰 수 (오류는 그대로 전파 → 스케줄러가 재시도)"""
+    print(f"\n🚀 크롤링 시작: {job.camera} (priority={job.priority})")
+    print(f"   검색어: {job.query}")
+    print(f"   max_videos={job.max_videos}, comments_per_video={job.comments_per_video}")
+
+    args = argparse.Namespace(
+        query=job.query,
+        camera=job.camera,
+        max_videos=job.max_videos,
+        comments_per_video=job.comments_per_video,
+        full_recrawl=full_recrawl,
+        on_inserted=on_inserted,
+        progress=progress,
+    )
+    return crawl_main(args)
+
+
+def _run_scheduled(run_job, camera_jobs: List[CameraJob], batch_id: str, workers: int, restart: bool):
+    """JobScheduler 로 job 실행 + 상태별 요약 출력"""
+    scheduler = JobScheduler(
+        run_job,
+        engine=get_engine(),
+        batch_id=batch_id,
+        workers=workers,
+    )
+    if restart:
+        scheduler.reset()
+
+    results = scheduler.run(camera_jobs)
+
+    by_status = {}
+    for r in results.values():
+        by_status[r.status] = by_status.get(r.status, 0) + 1
+    print(
+        "\n🎉 모든 CameraJob 처리 완료: "
+        + ", ".join(f"{status} {n}" for status, n in sorted(by_status.items()))
+    )
+    if by_status.get("deferred"):
+        print(f"⏸️  quota 소진으로 미룬 job 은 같은 batch_id({batch_id})로 다시 실행하면 이어서 처리")
+    return results
+
+
+# 1 이면 asyncio 동시 크롤링 엔진(youtube_async.py) 사용
+CRAWL_CONCURRENT = os.environ.get("CRAWL_CONCURRENT", "0") == "1"
+
+
+def run_batch(
+    concurrent: bool = CRAWL_CONCURRENT,
+    record_dir: Optional[str] = None,
+    full_recrawl: bool = False,
+    on_inserted: Optional[Callable[[List[int]], None]] = None,
+    workers: int = JOB_WORKERS,
+    batch_id: Optional[str] = None,
+    restart: bool = False,
+):
+    """
+    on_inserted: 비디오마다 새로 삽입된 review.id 리스트를 받는 콜백
+                 (stream_pipeline.py 가 라벨링 큐로 흘려보낼 때 사용)
+    workers    : 동시에 실행할 job 수
+    batch_id   : job 상태를 묶는 이름 (기본: 오늘 날짜) → 같은 값으로 다시 실행하면 이어서
+    restart    : batch_id 의 기존 job 상태를 지우고 처음부터
+    """
     # JSON 에서 카메라 목록 불러오기
     camera_jobs = load_camera_jobs()
 
-    print("📸 배치 크롤링 시작")
-    print(f"총 대상 카메라 기종 수: {len(camera_jobs)}")
-    print("-" * 60)
+    # 이번 달 ~ 몇 달 뒤 review 파티션이 있는지 확인 (없으면 생성)
+    ensure_partitions()
 
-    for job in camera_jobs:
-        print(f"\n🚀 크롤링 시작: {job.camera}")
-        print(f"   검색어: {job.query}")
-        print(f"   max_videos={job.max_videos}, comments_per_video={job.comments_per_video}")
+    # 오늘 이미 쓴 quota 부터 이어서 계산 (모든 job 이 공유)
+    budget = QuotaBudget.load(get_engine())
+    set_budget(budget)
+    if budget.remaining is not None:
+        print(f"📡 YouTube quota: 오늘 {budget.used} 사용, 남은 {budget.remaining}")
+
+    batch_id = batch_id or date.today().isoformat()
+
+    print("📸 배치 크롤링 시작" + (" (동시 크롤링 모드)" if concurrent else ""))
+    print(f"총 대상 카메라 기종 수: {len(camera_jobs)} (batch {batch_id}, 동시 job {workers}개)")
+    print("-" * 60)
 
-        # crawl_youtube_comments.main 이 argparse.Namespace와 비슷한 객체를 기대하므로,
-        # 동일한 속성을 가진 간단한 객체를 만들어 전달
-        class Args:
-            pass
+    if concurrent:
+        # job 안의 비디오들은 asyncio 로 동시에 수집 (모든 job 이 rate limiter 공유)
+        from youtube_async import AsyncJobRunner
 
-        args = Args()
-        args.query = job.query
-        args.camera = job.camera
-        args.max_videos = job.max_videos
-        args.comments_per_video = job.comments_per_video
+        with AsyncJobRunner(
+            record_dir=record_dir, full_recrawl=full_recrawl, on_inserted=on_inserted
+        ) as run_job:
+            return _run_scheduled(run_job, camera_jobs, batch_id, workers, restart)
 
-        # 실제 크롤링 실행
-        try:
-            crawl_main(args)
-        except Exception as e:
-            print(f"❌ {job.camera} 크롤링 중 오류 발생:", e)
-        else:
-            print(f"✅ {job.camera} 크롤링 완료")
+    # API 키가 없으면 카메라마다 같은 에러를 반복하지 않도록 시작 전에 확인
+    get_youtube()
 
-    print("\n🎉 모든 CameraJob 처리 완료")
+    run_job = partial(
+        crawl_job,
+        full_recrawl=full_recrawl,
+        on_inserted=on_inserted,
+        progress=workers <= 1,
+    )
+    return _run_scheduled(run_job, camera_jobs, batch_id, workers, restart)
 
 
 if __name__ == "__main__":
-    run_batch()
\ No newline at end of file
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "--concurrent",
+        action="store_true",
+        default=CRAWL_CONCURRENT,
+        help="job 안의 비디오를 asyncio 로 동시에 수집 (공유 rate limiter + 재시도, job 스케줄링은 동일)",
+    )
+    ap.add_argument("--record-dir", help="API 응답을 JSON 으로 저장할 폴더 (stub 서버 재생용)")
+    ap.add_argument(
+        "--full-recrawl",
+        action="store_true",
+        help="crawl_state / search 캐시를 무시하고 처음부터 다시 수집",
+    )
+    ap.add_argument("--workers", type=int, default=JOB_WORKERS, help="동시에 실행할 카메라 job 수")
+    ap.add_argument("--batch-id", default=None, help="job 상태를 묶는 이름 (기본: 오늘 날짜)")
+    ap.add_argument("--restart", action="store_true", help="batch_id 의 job 상태를 지우고 처음부터")
+    args = ap.parse_args()
+
+    run_batch(
+        concurrent=args.concurrent,
+        record_dir=args.record_dir,
+        full_recrawl=args.full_recrawl,
+        workers=args.workers,
+        batch_id=args.batch_id,
+        restart=args.restart,
+    )
\ No newline at end of file
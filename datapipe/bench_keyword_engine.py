@@ -0,0 +1,105 @@
+"""
+datapipe/bench_keyword_engine.py
+
+keyword_engine 점수 계산 속도 벤치마크.
+현재 review 행 수의 --scale 배(기본 10배) 크기의 가상 코퍼스를 만들어
+  - Counter → 희소 행렬 변환 (GroupTermMatrix.from_counters)
+  - scorer 별 점수 계산 + 그룹별 top_k 선정 (top_keywords)
+소요 시간을 출력한다. DB에는 아무것도 쓰지 않음.
+
+가상 코퍼스: 리뷰당 토큰 수 / 키워드 분포는 Zipf 분포로 생성,
+            그룹마다 키워드 순위를 조금씩 섞어서 "그룹별 특징 단어"가 생기도록 함
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python bench_keyword_engine.py --scale 10
+
+  # DB 없이 행 수 직접 지정
+  python bench_keyword_engine.py --rows 2000000 --groups 90
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import text
+
+from keyword_engine import SCORERS, GroupTermMatrix, top_keywords
+
+
+def current_review_count() -> int:
+    from db import get_engine
+
+    with get_engine().connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM review")).scalar_one()
+
+
+def synthetic_groups(rows: int, groups: int, vocab: int, tokens_per_review: int, seed: int = 42):
+    """
+    {(camera, sentiment): Counter} 가상 집계 결과.
+    리뷰 단위로 토큰을 만들지 않고, 그룹별 토큰 수만큼 Zipf 샘플을 뽑아 bincount 로 집계
+    """
+    rng = np.random.default_rng(seed)
+    reviews_per_group = rng.multinomial(rows, np.full(groups, 1.0 / groups))
+
+    counters = {}
+    for g, n_reviews in enumerate(reviews_per_group):
+        n_tokens = int(n_reviews) * tokens_per_review
+        ranks = rng.zipf(1.3, size=n_tokens)
+        ranks = ranks[ranks <= vocab] - 1
+        # 그룹마다 다른 순열을 일부 섞어서 그룹 고유 단어 만들기
+        perm = np.arange(vocab)
+        head = rng.permutation(200)
+        perm[:200] = perm[:200][head] if g % 2 else perm[:200]
+        ids = perm[ranks] if g % 3 else (ranks + g * 37) % vocab
+        counts = np.bincount(ids, minlength=vocab)
+        nz = np.flatnonzero(counts)
+        counters[(f"camera-{g // 3:03d}", ("positive", "neutral", "negative")[g % 3])] = Counter(
+            dict(zip((f"w{i}" for i in nz.tolist()), counts[nz].tolist()))
+        )
+    return counters
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=float, default=10.0, help="현재 review 행 수 대비 배수")
+    ap.add_argument("--rows", type=int, default=None, help="가상 리뷰 수 (지정하면 DB 조회 안 함)")
+    ap.add_argument("--groups", type=int, default=90, help="카메라 × 감성 그룹 수")
+    ap.add_argument("--vocab", type=int, default=200_000, help="키워드 어휘 크기")
+    ap.add_argument("--tokens-per-review", type=int, default=12)
+    ap.add_argument("--top-k", type=int, default=30)
+    args = ap.parse_args()
+
+    rows = args.rows
+    if rows is None:
+        base = current_review_count()
+        rows = int(base * args.scale)
+        print(f"📊 현재 review {base}행 × {args.scale:g} = {rows}행")
+
+    start = time.perf_counter()
+    counters = synthetic_groups(rows, args.groups, args.vocab, args.tokens_per_review)
+    print(f"🧪 가상 코퍼스 생성: {time.perf_counter() - start:.2f}s "
+          f"(그룹 {len(counters)}개, (그룹, 키워드) 쌍 {sum(len(c) for c in counters.values())}개)")
+
+    start = time.perf_counter()
+    gtm = GroupTermMatrix.from_counters(counters)
+    print(f"  • 행렬 변환      : {time.perf_counter() - start:.2f}s "
+          f"({gtm.counts.shape[0]} × {gtm.counts.shape[1]}, nnz={gtm.counts.nnz})")
+
+    for scorer in SCORERS:
+        start = time.perf_counter()
+        picked = top_keywords(gtm, args.top_k, scorer)
+        print(f"  • {scorer:<8} top_k : {time.perf_counter() - start:.2f}s ({len(picked)}행)")
+
+    # 비교용: 기존 방식 (그룹별 most_common)
+    start = time.perf_counter()
+    for counter in counters.values():
+        counter.most_common(args.top_k)
+    print(f"  • most_common    : {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+datapipe/bench_labeling.py
+
+감성 라벨링 추론 속도 벤치마크:
+  - 행 단위 classify_text()   (기존 방식)
+  - classify_batch()          (길이 정렬 + mini-batch)
+두 경로의 rows/sec 를 비교해서 출력한다. DB에는 아무것도 쓰지 않음.
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python bench_labeling.py --rows 512 --batch-sizes 8 16 32 64
+
+  # DB 에 있는 실제 리뷰로 측정하고 싶으면
+  python bench_labeling.py --from-db --rows 1000
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import text
+
+from db import get_engine
+from label_with_model import (
+    BACKEND,
+    BACKENDS,
+    classify_batch,
+    classify_text,
+    configure_backend,
+)
+
+
+# DB 없이 돌릴 때 사용하는 샘플 문장 (길이가 제각각이 되도록 조합)
+SAMPLE_SENTENCES = [
+    "AF가 빠르고 가벼워서 좋아요.",
+    "저조도에서 노이즈가 심해요.",
+    "색감이 만족스럽고 휴대성도 좋아요.",
+    "동영상 촬영할 때 발열이 생각보다 심해서 오래 찍기는 힘들어요.",
+    "렌즈 라인업이 아쉽지만 바디 자체는 훌륭합니다.",
+    "손떨림 보정이 확실히 좋아져서 야간 스냅도 편하게 찍었습니다.",
+    "배터리가 금방 닳아서 여분 배터리는 필수네요.",
+]
+
+
+def load_texts(n: int, from_db: bool):
+    if from_db:
+        with get_engine().connect() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT content
+                      FROM review
+                     WHERE content IS NOT NULL
+                       AND TRIM(content) <> ''
+                     ORDER BY id DESC
+                     LIMIT :n
+                    """
+                ),
+                {"n": n},
+            ).scalars().all()
+        return [r.strip() for r in rows]
+
+    rnd = random.Random(42)
+    texts = []
+    for _ in range(n):
+        k = rnd.randint(1, 6)
+        texts.append(" ".join(rnd.choice(SAMPLE_SENTENCES) for _ in range(k)))
+    return texts
+
+
+def bench_per_row(texts):
+    start = time.perf_counter()
+    for t in texts:
+        classify_text(t)
+    return time.perf_counter() - start
+
+
+def bench_batched(texts, batch_size: int):
+    start = time.perf_counter()
+    classify_batch(texts, batch_size=batch_size)
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=512, help="측정에 사용할 문장 수")
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 16, 32, 64])
+    ap.add_argument("--from-db", action="store_true", help="review 테이블에서 문장 로드")
+    ap.add_argument("--backend", choices=BACKENDS, default=BACKEND, help="추론 backend")
+    args = ap.parse_args()
+
+    configure_backend(args.backend)
+
+    texts = load_texts(args.rows, args.from_db)
+    print(f"📏 벤치마크 문장 수: {len(texts)} (backend={args.backend})")
+
+    # 첫 호출 warm-up (lazy 초기화 비용 제외)
+    classify_batch(texts[:8], batch_size=8)
+
+    elapsed = bench_per_row(texts)
+    base = len(texts) / elapsed
+    print(f"  • per-row          : {base:8.1f} rows/sec ({elapsed:.2f}s)")
+
+    for bs in args.batch_sizes:
+        elapsed = bench_batched(texts, bs)
+        rps = len(texts) / elapsed
+        print(f"  • batched (bs={bs:<3}) : {rps:8.1f} rows/sec ({elapsed:.2f}s, x{rps / base:.2f})")
+
+
+if __name__ == "__main__":
+    main()
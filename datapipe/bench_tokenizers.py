@@ -0,0 +1,68 @@
+"""
+datapipe/bench_tokenizers.py
+
+키워드 토큰화 backend 속도 벤치마크 (keyword_tokenizers.TOKENIZERS).
+backend 별로
+  - cold : 캐시 없이 전부 토큰화
+  - warm : 같은 문장을 프로세스 내부 LRU 캐시로 다시 처리 (반복 실행 시나리오)
+의 rows/sec 를 비교해서 출력한다. DB에는 아무것도 쓰지 않음.
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python bench_tokenizers.py --rows 20000
+
+  # DB 에 있는 실제 리뷰로 측정 / 특정 backend 만
+  python bench_tokenizers.py --from-db --rows 50000 --tokenizers regex josa
+"""
+
+import argparse
+import time
+
+from bench_labeling import load_texts
+from keyword_tokenizers import TOKENIZERS, CachedTokenizer, build_tokenizer
+
+
+def bench(tokenizer, texts):
+    start = time.perf_counter()
+    tokenizer.tokenize_many(texts)
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20000, help="측정에 사용할 문장 수")
+    ap.add_argument("--from-db", action="store_true", help="review 테이블에서 문장 로드")
+    ap.add_argument("--tokenizers", choices=TOKENIZERS, nargs="+", default=list(TOKENIZERS))
+    args = ap.parse_args()
+
+    texts = load_texts(args.rows, args.from_db)
+    print(f"📏 벤치마크 문장 수: {len(texts)} (서로 다른 문장 {len(set(texts))}개)")
+
+    base = None
+    for name in args.tokenizers:
+        try:
+            tokenizer = build_tokenizer(name)
+        except RuntimeError as e:
+            print(f"  • {name:<6}: 건너뜀 ({e})")
+            continue
+
+        # 첫 호출 warm-up (lazy 초기화 비용 제외)
+        tokenizer.tokenize_many(texts[:8])
+
+        elapsed = bench(tokenizer, texts)
+        rps = len(texts) / elapsed
+        if base is None:
+            base = rps
+        print(f"  • {name:<6} cold : {rps:10.1f} rows/sec ({elapsed:.2f}s, x{rps / base:.2f})")
+
+        cached = CachedTokenizer(tokenizer)
+        cached.tokenize_many(texts)
+        elapsed = bench(cached, texts)
+        rps = len(texts) / elapsed
+        print(f"  • {name:<6} warm : {rps:10.1f} rows/sec ({elapsed:.2f}s, x{rps / base:.2f})")
+
+
+if __name__ == "__main__":
+    main()
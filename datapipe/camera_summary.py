@@ -0,0 +1,117 @@
+"""
+datapipe/camera_summary.py
+
+(카메라, 날짜) 별 요약 테이블 camera_sentiment_summary 조회 / 재계산.
+
+요약 테이블은 review 의 INSERT / UPDATE / DELETE 트리거가 증감분을 바로 반영한다
+(db-init/014_camera_sentiment_summary.sql). 크롤링 INSERT, 라벨링 COPY + UPDATE,
+near-duplicate 표시 등 어느 경로로 바뀌어도 따로 호출할 필요 없음.
+
+  - 요약 출력(full_pipeline.print_db_summary) 은 review 전체 GROUP BY 대신 이 테이블만 읽음
+    → 리뷰 수가 아니라 (카메라 × 날짜) 수에 비례
+  - 트리거를 끈 채 대량 적재했거나 값이 어긋났다고 의심되면 --rebuild 로 review 에서 다시 계산
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python camera_summary.py             # 요약 출력
+  python camera_summary.py --rebuild   # review 전체로 다시 계산
+"""
+
+import argparse
+from typing import List, Tuple
+
+from sqlalchemy import text
+
+from db import get_engine
+
+
+# 재계산 중 들어오는 변경은 트리거가 이 잠금을 기다렸다가 재계산 결과 위에 반영
+LOCK_SUMMARY_SQL = text("LOCK TABLE camera_sentiment_summary IN EXCLUSIVE MODE")
+
+DELETE_SUMMARY_SQL = text("DELETE FROM camera_sentiment_summary")
+
+REBUILD_SUMMARY_SQL = text("""
+  INSERT INTO camera_sentiment_summary (
+      camera_model, day, review_count, scored_count, score_sum,
+      positive_count, neutral_count, negative_count, unlabeled_count
+  )
+  SELECT COALESCE(camera_model, ''),
+         COALESCE(created_at::date, '-infinity'::date),
+         count(*),
+         count(sentiment_score),
+         COALESCE(sum(sentiment_score), 0),
+         count(*) FILTER (WHERE sentiment_label = 'positive'),
+         count(*) FILTER (WHERE sentiment_label = 'neutral'),
+         count(*) FILTER (WHERE sentiment_label = 'negative'),
+         count(*) FILTER (WHERE sentiment_label IS NULL)
+    FROM review
+   GROUP BY 1, 2
+""")
+
+TOTAL_SQL = text("""
+  SELECT COALESCE(sum(review_count), 0)
+    FROM camera_sentiment_summary
+""")
+
+BY_CAMERA_SQL = text("""
+  SELECT camera_model, sum(review_count) AS cnt
+    FROM camera_sentiment_summary
+   GROUP BY camera_model
+  HAVING sum(review_count) > 0
+   ORDER BY cnt DESC, camera_model
+""")
+
+BY_LABEL_SQL = text("""
+  SELECT COALESCE(sum(positive_count), 0),
+         COALESCE(sum(neutral_count), 0),
+         COALESCE(sum(negative_count), 0),
+         COALESCE(sum(unlabeled_count), 0),
+         COALESCE(sum(review_count), 0)
+    FROM camera_sentiment_summary
+""")
+
+
+def rebuild(engine=None) -> int:
+    """review 전체로 요약 테이블을 다시 채우고 (카메라, 날짜) 행 수 반환"""
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        conn.execute(LOCK_SUMMARY_SQL)
+        conn.execute(DELETE_SUMMARY_SQL)
+        return conn.execute(REBUILD_SUMMARY_SQL).rowcount
+
+
+def total_reviews(conn) -> int:
+    return int(conn.execute(TOTAL_SQL).scalar_one())
+
+
+def count_by_camera(conn) -> List[Tuple[str, int]]:
+    """[(camera_model, 리뷰 수)] — camera_model 이 없는 리뷰는 None"""
+    return [(cam or None, int(cnt)) for cam, cnt in conn.execute(BY_CAMERA_SQL)]
+
+
+def count_by_label(conn) -> List[Tuple[str, int]]:
+    """[(sentiment_label, 리뷰 수)] 개수 내림차순 — 라벨이 없는 리뷰는 None"""
+    positive, neutral, negative, unlabeled, total = conn.execute(BY_LABEL_SQL).one()
+    counts = {"positive": positive, "neutral": neutral, "negative": negative, None: unlabeled}
+    # 세 라벨 / NULL 외의 값(수동 입력 등)은 나머지로 계산
+    other = total - sum(counts.values())
+    if other:
+        counts["(기타)"] = other
+    rows = [(label, int(cnt)) for label, cnt in counts.items() if cnt]
+    return sorted(rows, key=lambda r: (-r[1], r[0] or ""))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rebuild", action="store_true", help="review 전체로 요약 테이블 다시 계산")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        n = rebuild()
+        print(f"✅ camera_sentiment_summary 재계산 완료: (카메라, 날짜) {n}행")
+
+    from full_pipeline import print_db_summary
+
+    print_db_summary()
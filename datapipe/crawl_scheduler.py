@@ -0,0 +1,218 @@
+"""
+datapipe/crawl_scheduler.py
+
+카메라별 크롤링 job 스케줄러 (batch_crawl_cameras.run_batch 에서 사용).
+
+  - job 여러 개를 worker 스레드(CRAWL_JOB_WORKERS, 기본 4)로 동시에 실행
+  - priority 가 높은 job 부터 시작 (camera_list.json 의 "priority", 같으면 파일 순서)
+  - 실패한 job 은 지수 backoff 후 재시도 (CRAWL_JOB_MAX_ATTEMPTS, 기본 3회)
+    기다리는 동안 worker 는 다른 job 을 처리
+  - YouTube quota 는 모든 job 이 하나의 QuotaBudget 을 공유 (youtube_quota.py)
+    소진되면 남은 job 은 deferred 로 남겨두고 종료
+  - job 상태는 crawl_job_status 테이블에 (batch_id, camera) 단위로 기록
+    → 같은 batch_id 로 다시 실행하면 done 인 job 은 건너뛰고 나머지만 실행
+
+  scheduler = JobScheduler(run_job, workers=4, batch_id="2025-01-31")
+  results = scheduler.run(jobs)     # { camera: JobResult }
+"""
+
+import heapq
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from metrics import incr
+from youtube_quota import QuotaExhausted, get_budget
+
+JOB_WORKERS = int(os.environ.get("CRAWL_JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("CRAWL_JOB_MAX_ATTEMPTS", "3"))
+JOB_BACKOFF_BASE = float(os.environ.get("CRAWL_JOB_BACKOFF_SEC", "30"))  # 초
+JOB_BACKOFF_MAX = 600.0  # 초
+
+
+LOAD_STATUS_SQL = text("""
+  SELECT camera, status
+    FROM crawl_job_status
+   WHERE batch_id = :batch_id
+""")
+
+SAVE_STATUS_SQL = text("""
+  INSERT INTO crawl_job_status (
+      batch_id, camera, status, priority, attempts, inserted, last_error,
+      started_at, finished_at, updated_at
+  ) VALUES (
+      :batch_id, :camera, :status, :priority, :attempts, :inserted, :last_error,
+      CASE WHEN :status = 'running' THEN now() END,
+      CASE WHEN :status IN ('done', 'failed', 'deferred') THEN now() END,
+      now()
+  )
+  ON CONFLICT (batch_id, camera) DO UPDATE
+     SET status      = EXCLUDED.status,
+         priority    = EXCLUDED.priority,
+         attempts    = EXCLUDED.attempts,
+         inserted    = EXCLUDED.inserted,
+         last_error  = EXCLUDED.last_error,
+         started_at  = COALESCE(crawl_job_status.started_at, EXCLUDED.started_at),
+         finished_at = EXCLUDED.finished_at,
+         updated_at  = now()
+""")
+
+RESET_BATCH_SQL = text("DELETE FROM crawl_job_status WHERE batch_id = :batch_id")
+
+
+@dataclass
+class JobResult:
+    camera: str
+    status: str = "pending"   # done / failed / deferred / skipped
+    attempts: int = 0
+    inserted: int = 0
+    error: Optional[str] = None
+
+
+class JobScheduler:
+    """
+    run_job(job) -> 삽입 수 를 job 마다 호출.
+    job 은 camera / priority 속성만 있으면 됨 (batch_crawl_cameras.CameraJob)
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[object], int],
+        engine,
+        batch_id: str,
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        backoff_base: float = JOB_BACKOFF_BASE,
+    ):
+        self.run_job = run_job
+        self.engine = engine
+        self.batch_id = batch_id
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+
+    # ----- 상태 테이블 -----
+    def load_done(self) -> set:
+        with self.engine.connect() as conn:
+            rows = conn.execute(LOAD_STATUS_SQL, {"batch_id": self.batch_id}).fetchall()
+        return {camera for camera, status in rows if status == "done"}
+
+    def reset(self):
+        with self.engine.begin() as conn:
+            conn.execute(RESET_BATCH_SQL, {"batch_id": self.batch_id})
+
+    def _save(self, job, result: JobResult, status: str):
+        with self.engine.begin() as conn:
+            conn.execute(
+                SAVE_STATUS_SQL,
+                {
+                    "batch_id": self.batch_id,
+                    "camera": job.camera,
+                    "status": status,
+                    "priority": job.priority,
+                    "attempts": result.attempts,
+                    "inserted": result.inserted,
+                    "last_error": result.error,
+                },
+            )
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(JOB_BACKOFF_MAX, self.backoff_base * (2 ** (attempts - 1)))
+        return delay * (0.5 + random.random())
+
+    # ----- 실행 -----
+    def run(self, jobs: List) -> Dict[str, JobResult]:
+        results: Dict[str, JobResult] = {}
+
+        done_before = self.load_done()
+        ready = []     # (-priority, 순서, job)
+        for seq, job in enumerate(jobs):
+            results[job.camera] = JobResult(job.camera)
+            if job.camera in done_before:
+                results[job.camera].status = "skipped"
+                continue
+            heapq.heappush(ready, (-job.priority, seq, job))
+            self._save(job, results[job.camera], "pending")
+
+        if done_before:
+            print(f"⏭️  batch {self.batch_id}: 이미 완료된 job {len(done_before & set(results))}개 건너뜀")
+
+        delayed = []   # (재시도 가능 시각, -priority, 순서, job)
+        running = {}   # future -> (job, 순서)
+        quota_exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawl-job") as pool:
+            while ready or delayed or running:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, neg_priority, seq, job = heapq.heappop(delayed)
+                    heapq.heappush(ready, (neg_priority, seq, job))
+
+                # quota 를 다 썼으면 새 job 은 시작하지 않음 (다음 실행에서 이어서)
+                if quota_exhausted:
+                    for _, _, job in ready:
+                        self._defer(job, results[job.camera])
+                    for _, _, _, job in delayed:
+                        self._defer(job, results[job.camera])
+                    ready, delayed = [], []
+
+                while ready and len(running) < self.workers:
+                    _, seq, job = heapq.heappop(ready)
+                    result = results[job.camera]
+                    result.attempts += 1
+                    self._save(job, result, "running")
+                    running[pool.submit(self.run_job, job)] = (job, seq)
+
+                if not running:
+                    if delayed:
+                        time.sleep(max(0.0, delayed[0][0] - time.monotonic()))
+                    continue
+
+                timeout = None
+                if delayed:
+                    timeout = max(0.0, delayed[0][0] - time.monotonic())
+                finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    job, seq = running.pop(future)
+                    result = results[job.camera]
+                    try:
+                        result.inserted += int(future.result() or 0)
+                    except QuotaExhausted as e:
+                        result.error = str(e)
+                        quota_exhausted = True
+                        self._defer(job, result)
+                    except Exception as e:
+                        result.error = f"{type(e).__name__}: {e}"[:1000]
+                        if result.attempts < self.max_attempts:
+                            delay = self._backoff(result.attempts)
+                            print(f"🔁 {job.camera} 실패 ({result.error}) → {delay:.0f}s 후 재시도")
+                            incr("crawl_job_retries")
+                            self._save(job, result, "retrying")
+                            heapq.heappush(
+                                delayed, (time.monotonic() + delay, -job.priority, seq, job)
+                            )
+                        else:
+                            print(f"❌ {job.camera} 크롤링 실패 ({result.attempts}회 시도): {result.error}")
+                            result.status = "failed"
+                            incr("crawl_jobs_failed")
+                            self._save(job, result, "failed")
+                    else:
+                        result.status = "done"
+                        result.error = None
+                        incr("crawl_jobs_done")
+                        self._save(job, result, "done")
+                        print(f"✅ {job.camera} 크롤링 완료 (삽입 {result.inserted}건)")
+
+        get_budget().flush(self.engine)
+        return results
+
+    def _defer(self, job, result: JobResult):
+        result.status = "deferred"
+        incr("crawl_jobs_deferred")
+        self._save(job, result, "deferred")
@@ -0,0 +1,307 @@
+"""
+datapipe/crawl_state.py
+
+증분 크롤링 상태 관리.
+
+  1) crawl_state 테이블: (camera_model, video_id) 별
+     - 마지막으로 본 가장 최신 댓글 (publishedAt, comment id) = high-water mark
+     - 이전 실행이 max_comments 에서 멈춘 위치의 page token (더 오래된 댓글 이어받기)
+     - 새 댓글이 한도보다 많아서 delta 가 이전 mark 까지 못 갔으면 그 구간(gap)의 끝 지점
+  2) search_cache 테이블: (query, max_results) 별 search 결과 videoId 목록 + TTL
+
+commentThreads 는 최신순(order=time)으로 내려오므로,
+재크롤링 시 high-water mark 에 도달하면 바로 페이지 넘기기를 멈춘다.
+→ 매일 돌리는 크롤링이 "전체 재수집"이 아니라 "새로 달린 댓글(delta)"만 가져옴.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+
+# search 결과 캐시 유지 시간 (시간 단위)
+SEARCH_CACHE_TTL_HOURS = float(os.environ.get("SEARCH_CACHE_TTL_HOURS", "24"))
+
+
+LOAD_STATES_SQL = text("""
+  SELECT video_id, last_published_at, last_comment_id, page_token,
+         stop_published_at, stop_comment_id, older_page_token
+    FROM crawl_state
+   WHERE camera_model = :camera_model
+     AND video_id = ANY(:video_ids)
+""")
+
+SAVE_STATE_SQL = text("""
+  INSERT INTO crawl_state (
+      camera_model, video_id, last_published_at, last_comment_id, page_token,
+      stop_published_at, stop_comment_id, older_page_token, updated_at
+  ) VALUES (
+      :camera_model, :video_id, :last_published_at, :last_comment_id, :page_token,
+      :stop_published_at, :stop_comment_id, :older_page_token, now()
+  )
+  ON CONFLICT (camera_model, video_id) DO UPDATE
+     SET last_published_at = EXCLUDED.last_published_at,
+         last_comment_id   = EXCLUDED.last_comment_id,
+         page_token        = EXCLUDED.page_token,
+         stop_published_at = EXCLUDED.stop_published_at,
+         stop_comment_id   = EXCLUDED.stop_comment_id,
+         older_page_token  = EXCLUDED.older_page_token,
+         updated_at        = now()
+""")
+
+LOAD_SEARCH_SQL = text("""
+  SELECT video_ids
+    FROM search_cache
+   WHERE query = :query
+     AND max_results = :max_results
+     AND fetched_at > now() - make_interval(secs => :ttl_seconds)
+""")
+
+SAVE_SEARCH_SQL = text("""
+  INSERT INTO search_cache (query, max_results, video_ids, fetched_at)
+  VALUES (:query, :max_results, :video_ids, now())
+  ON CONFLICT (query, max_results) DO UPDATE
+     SET video_ids  = EXCLUDED.video_ids,
+         fetched_at = now()
+""")
+
+
+@dataclass
+class VideoCrawlState:
+    last_published_at: Optional[str] = None  # ISO8601 (YouTube publishedAt 형식)
+    last_comment_id: Optional[str] = None
+    page_token: Optional[str] = None         # 다음 실행에서 이어받을 위치
+    # page_token 이 gap(delta 가 max_comments 에서 멈춰서 못 받은 구간)의 이어받기 위치일 때:
+    #   gap 은 이전 high-water mark (stop_published_at, stop_comment_id) 에서 끝나고,
+    #   그 뒤로는 older_page_token 부터 더 오래된 댓글 backfill
+    stop_published_at: Optional[str] = None
+    stop_comment_id: Optional[str] = None
+    older_page_token: Optional[str] = None
+
+
+def _reached(c: dict, last_at: Optional[str], last_id: Optional[str]) -> bool:
+    """최신순으로 내려오는 댓글 c 가 (last_at, last_id) 지점 또는 그보다 오래된 댓글인지"""
+    if not last_at or not c.get("publishedAt"):
+        return False
+    if c.get("comment_id") and c["comment_id"] == last_id:
+        return True
+    return c["publishedAt"] < last_at
+
+
+class CommentPager:
+    """
+    비디오 1개의 commentThreads 페이지 넘기기 상태 머신.
+    동기(crawl_youtube_comments) / 비동기(youtube_async) 크롤러가 같이 사용.
+
+      pager = CommentPager(video_id, max_comments, state)
+      while pager.has_next():
+          resp = <commentThreads 요청>(pageToken=pager.page_token, maxResults=pager.page_size())
+          pager.feed(resp)
+      pager.comments, pager.result_state()
+
+    단계:
+      - delta    : 최신 댓글부터 high-water mark 를 만날 때까지
+      - gap      : 이전 실행의 delta 가 한도에서 멈춘 위치부터 그때의 high-water mark 까지
+      - backfill : 이전 실행이 멈춘 page token 부터 (남은 수집 한도 안에서)
+
+    실패 처리 (fail):
+      - delta 중 실패 → result_state() 가 None (저장된 상태를 그대로 둠)
+        high-water mark 를 올리면 실패 지점 ~ 이전 mark 사이 댓글을 다시는 받지 못함
+      - gap / backfill 중 실패 → 실패한 page token 을 이어받기 위치로 남김
+    """
+
+    def __init__(self, video_id: str, max_comments: int, state: Optional[VideoCrawlState], parse):
+        self.video_id = video_id
+        self.max_comments = max_comments
+        self.state = state or VideoCrawlState()
+        self.parse = parse
+
+        self.phase = "delta"
+        self.page_token: Optional[str] = None
+        self.done = False
+        self.failed = False
+        self.comments: List[dict] = []
+
+        self._newest: Optional[dict] = None
+        # 다음 실행을 위한 이어받기 위치 (단계가 끝날 때마다 갱신)
+        self._token = self.state.page_token
+        self._stop = None
+        if self.state.stop_published_at and self._token:
+            self._stop = (self.state.stop_published_at, self.state.stop_comment_id)
+        self._older = self.state.older_page_token if self._stop else None
+        self.reached_known = False
+
+    def has_next(self) -> bool:
+        return not self.done and len(self.comments) < self.max_comments
+
+    def page_size(self) -> int:
+        return min(100, self.max_comments - len(self.comments))
+
+    def _boundary(self):
+        """현재 단계에서 멈춰야 하는 지점 (없으면 None)"""
+        if self.phase == "delta":
+            return self.state.last_published_at, self.state.last_comment_id
+        if self.phase == "gap":
+            return self._stop
+        return None
+
+    def feed(self, resp: dict):
+        """commentThreads 응답 1페이지 반영"""
+        items = resp.get("items", [])
+        boundary = self._boundary()
+        hit_boundary = False
+
+        for it in items:
+            c = self.parse(it, self.video_id)
+            if self.phase == "delta" and self._newest is None:
+                self._newest = c
+            if boundary is not None and _reached(c, *boundary):
+                hit_boundary = True
+                break
+            if c["text"]:
+                self.comments.append(c)
+                if len(self.comments) >= self.max_comments:
+                    break
+
+        next_token = resp.get("nextPageToken") if items else None
+        full = len(self.comments) >= self.max_comments
+
+        if hit_boundary:
+            self._finish_phase(full)
+            return
+
+        if not next_token:
+            # 비디오 댓글 끝까지 받음 → 더 이어받을 위치 없음
+            self._token = self._stop = self._older = None
+            self.done = True
+            return
+
+        if full:
+            self._stop_at_limit(next_token)
+            self.done = True
+            return
+
+        self.page_token = next_token
+
+    def _finish_phase(self, full: bool):
+        """현재 단계의 끝 지점에 도달 → 다음 단계로 (한도가 찼으면 종료)"""
+        if self.phase == "delta":
+            self.reached_known = True
+        elif self.phase == "gap":
+            # gap 을 다 메움 → 그 뒤는 원래 backfill 위치부터
+            self._token, self._stop, self._older = self._older, None, None
+
+        if full or not self._token:
+            self.done = True
+            return
+
+        self.phase = "gap" if self._stop else "backfill"
+        self.page_token = self._token
+
+    def _stop_at_limit(self, next_token: str):
+        """한도가 차서 next_token 앞에서 멈춤 → 다음 실행이 여기서 이어받도록 기록"""
+        if self.phase == "delta" and self.state.last_published_at:
+            # 이전 high-water mark 까지 못 받음 → gap 으로 남기고 기존 backfill 위치는 보존
+            # (이미 gap 이 남아 있었으면 그 끝 지점까지 한 구간으로 합침)
+            if self._stop is None:
+                self._stop = (self.state.last_published_at, self.state.last_comment_id)
+                self._older = self._token
+        self._token = next_token
+
+    def fail(self):
+        """요청 실패 시 호출"""
+        if self.phase == "delta":
+            self.failed = True
+        else:
+            self._token = self.page_token
+        self.done = True
+
+    def result_state(self) -> Optional[VideoCrawlState]:
+        """다음 실행을 위한 상태. None 이면 저장된 상태를 바꾸지 말 것 (delta 중 실패)"""
+        if self.failed:
+            return None
+
+        newest = self._newest
+        if newest is not None and newest.get("publishedAt"):
+            last_at = newest["publishedAt"]
+            last_id = newest.get("comment_id")
+        else:
+            last_at = self.state.last_published_at
+            last_id = self.state.last_comment_id
+        stop_at, stop_id = self._stop or (None, None)
+        return VideoCrawlState(
+            last_published_at=last_at,
+            last_comment_id=last_id,
+            page_token=self._token,
+            stop_published_at=stop_at,
+            stop_comment_id=stop_id,
+            older_page_token=self._older,
+        )
+
+
+# -----------------------------
+# DB 저장 / 조회
+# -----------------------------
+def _iso(v) -> Optional[str]:
+    """TIMESTAMPTZ → YouTube publishedAt 과 비교 가능한 'YYYY-MM-DDTHH:MM:SSZ' 문자열"""
+    if v is None or isinstance(v, str):
+        return v
+    if v.tzinfo is None:
+        v = v.replace(tzinfo=timezone.utc)
+    return v.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def load_states(engine, camera_model: str, video_ids: Iterable[str]) -> Dict[str, VideoCrawlState]:
+    video_ids = list(video_ids)
+    if not video_ids:
+        return {}
+    with engine.connect() as conn:
+        rows = conn.execute(
+            LOAD_STATES_SQL, {"camera_model": camera_model, "video_ids": video_ids}
+        ).fetchall()
+    return {
+        vid: VideoCrawlState(_iso(last_at), last_id, token, _iso(stop_at), stop_id, older)
+        for vid, last_at, last_id, token, stop_at, stop_id, older in rows
+    }
+
+
+def save_state(engine, camera_model: str, video_id: str, state: VideoCrawlState):
+    with engine.begin() as conn:
+        conn.execute(
+            SAVE_STATE_SQL,
+            {
+                "camera_model": camera_model,
+                "video_id": video_id,
+                "last_published_at": state.last_published_at,
+                "last_comment_id": state.last_comment_id,
+                "page_token": state.page_token,
+                "stop_published_at": state.stop_published_at,
+                "stop_comment_id": state.stop_comment_id,
+                "older_page_token": state.older_page_token,
+            },
+        )
+
+
+def load_cached_search(
+    engine, query: str, max_results: int, ttl_hours: float = SEARCH_CACHE_TTL_HOURS
+) -> Optional[List[str]]:
+    """TTL 안에 저장된 search 결과가 있으면 videoId 리스트, 없으면 None"""
+    if ttl_hours <= 0:
+        return None
+    with engine.connect() as conn:
+        row = conn.execute(
+            LOAD_SEARCH_SQL,
+            {"query": query, "max_results": max_results, "ttl_seconds": ttl_hours * 3600},
+        ).fetchone()
+    return list(row[0]) if row else None
+
+
+def save_search(engine, query: str, max_results: int, video_ids: List[str]):
+    with engine.begin() as conn:
+        conn.execute(
+            SAVE_SEARCH_SQL,
+            {"query": query, "max_results": max_results, "video_ids": video_ids},
+        )
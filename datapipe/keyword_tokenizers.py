@@ -0,0 +1,299 @@
+"""
+datapipe/keyword_tokenizers.py
+
+키워드 분석용 토큰화 backend 선택.
+
+  - regex : 특수문자 제거 + 공백 split (기본값, 가장 빠름)
+  - josa  : regex 결과에서 자주 쓰는 조사/어미를 떼어냄 (순수 Python, 추가 설치 없음)
+            "색감이" / "색감은" / "색감도" → "색감"
+  - kiwi  : kiwipiepy 형태소 분석기로 명사/외국어/어근만 추출 (pip install kiwipiepy)
+
+형태소 분석은 split() 보다 수십 배 느리므로,
+kiwi backend 는 리뷰 본문 sha256 기준으로 토큰 결과를 캐시한다.
+(regex / josa 는 캐시 조회가 토큰화보다 비싸서 캐시하지 않음)
+
+  1) 프로세스 내부 LRU
+  2) PostgreSQL keyword_token_cache 테이블 (실행 간 공유, db-init/010_keyword_tokenizer.sql)
+     키는 "kiwi:<설정 해시>" → STOPWORDS / KIWI_TAGS / kiwipiepy 버전이 바뀌면 예전 결과를 쓰지 않음
+
+backend 별 속도 비교: python bench_tokenizers.py
+"""
+
+import hashlib
+import os
+import re
+from typing import Dict, List, Sequence
+
+from sqlalchemy import text
+
+from metrics import incr
+from sentiment_cache import LRUCache
+
+
+TOKENIZERS = ("regex", "josa", "kiwi")
+
+DEFAULT_TOKENIZER = os.environ.get("KEYWORD_TOKENIZER", "regex")
+
+# 너무 당연한 단어, 노이즈 단어는 제거 (원하는 대로 계속 추가 가능)
+STOPWORDS = frozenset({
+    "영상", "리뷰", "카메라", "사진", "후기",
+    "진짜", "정말", "조금", "거의", "보고",
+    "이거", "저거", "그냥", "사용", "사용기",
+    "유튜브", "채널", "구독", "감사", "설명",
+})
+
+# 한글/영어/숫자/공백 이외의 문자 (모듈 로드 시 1번만 컴파일)
+_NON_WORD_RE = re.compile(r"[^0-9가-힣A-Za-z\s]")
+
+# 떼어낼 조사/어미
+JOSA_SUFFIXES = frozenset({
+    "에서는", "에서도", "으로는", "으로도", "에게서", "까지는", "부터는", "이라도", "이에요",
+    "에서", "으로", "에게", "한테", "까지", "부터", "보다", "처럼", "마다",
+    "이랑", "이나", "이라", "밖에", "이고", "예요", "네요", "어요", "아요",
+    "은", "는", "이", "가", "을", "를", "의", "에", "도", "만", "와", "과", "로", "랑",
+})
+
+# 긴 조사부터 매칭하기 위한 길이 목록 (3, 2, 1)
+_JOSA_LENGTHS = sorted({len(x) for x in JOSA_SUFFIXES}, reverse=True)
+
+# 조사를 떼고 남아야 하는 최소 글자 수 ("사이" → "사" 같은 과도한 절단 방지)
+JOSA_MIN_STEM = 2
+
+# kiwi backend 에서 키워드로 남길 품사 (일반/고유명사, 외국어, 어근)
+KIWI_TAGS = ("NNG", "NNP", "SL", "XR")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    매우 단순한 한국어 토큰화 (regex backend):
+      - 특수문자 제거
+      - 공백 기준 split
+      - 1글자 토큰, 불용어 제거
+    """
+    if not text:
+        return []
+
+    # 한글/영어/숫자/공백만 남기고 나머지는 공백 처리
+    return [
+        tok
+        for tok in _NON_WORD_RE.sub(" ", text).split()
+        if len(tok) > 1 and tok not in STOPWORDS
+    ]
+
+
+def strip_josa(tok: str) -> str:
+    """한글 토큰 끝의 조사/어미를 1개 떼어냄 (남는 길이가 JOSA_MIN_STEM 미만이면 그대로)"""
+    if not ("가" <= tok[-1] <= "힣"):
+        return tok
+    for n in _JOSA_LENGTHS:
+        if len(tok) - n >= JOSA_MIN_STEM and tok[-n:] in JOSA_SUFFIXES:
+            return tok[:-n]
+    return tok
+
+
+class RegexTokenizer:
+    name = "regex"
+    # 캐시 조회 비용이 토큰화보다 비싸므로 캐시하지 않음
+    cacheable = False
+
+    def config(self) -> tuple:
+        """토큰 결과에 영향을 주는 설정 (캐시 키에 들어감)"""
+        return (sorted(STOPWORDS),)
+
+    def tokenize(self, text: str) -> List[str]:
+        return tokenize(text)
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[List[str]]:
+        return [self.tokenize(t) for t in texts]
+
+
+class JosaTokenizer(RegexTokenizer):
+    name = "josa"
+    # 접미사 비교만 하므로 regex 와 마찬가지로 캐시가 더 느림
+    cacheable = False
+
+    def config(self) -> tuple:
+        return (sorted(STOPWORDS), sorted(JOSA_SUFFIXES), JOSA_MIN_STEM)
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = []
+        for tok in tokenize(text):
+            tok = strip_josa(tok)
+            if tok not in STOPWORDS:
+                tokens.append(tok)
+        return tokens
+
+
+class KiwiTokenizer(RegexTokenizer):
+    name = "kiwi"
+    cacheable = True
+
+    def __init__(self):
+        try:
+            from kiwipiepy import Kiwi
+        except ImportError as e:
+            raise RuntimeError(
+                "kiwi tokenizer 를 쓰려면 kiwipiepy 가 필요합니다: pip install kiwipiepy"
+            ) from e
+        self._kiwi = Kiwi()
+
+    def config(self) -> tuple:
+        import kiwipiepy
+
+        return (sorted(STOPWORDS), KIWI_TAGS, kiwipiepy.__version__)
+
+    def _filter(self, morphs) -> List[str]:
+        return [
+            m.form
+            for m in morphs
+            if m.tag.startswith(KIWI_TAGS) and len(m.form) > 1 and m.form not in STOPWORDS
+        ]
+
+    def tokenize(self, text: str) -> List[str]:
+        if not text:
+            return []
+        return self._filter(self._kiwi.tokenize(text))
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[List[str]]:
+        # kiwipiepy 는 여러 문장을 한 번에 넘기면 내부에서 병렬로 분석
+        return [self._filter(morphs) for morphs in self._kiwi.tokenize(list(texts))]
+
+
+def build_tokenizer(name: str = DEFAULT_TOKENIZER):
+    if name == "regex":
+        return RegexTokenizer()
+    if name == "josa":
+        return JosaTokenizer()
+    if name == "kiwi":
+        return KiwiTokenizer()
+    raise ValueError(f"지원하지 않는 tokenizer: {name} (가능: {', '.join(TOKENIZERS)})")
+
+
+# -----------------------------
+# 토큰 캐시
+# -----------------------------
+LOOKUP_SQL = text("""
+  SELECT text_hash, tokens
+    FROM keyword_token_cache
+   WHERE tokenizer = :tokenizer
+     AND text_hash = ANY(:hashes)
+""")
+
+STORE_SQL = text("""
+  INSERT INTO keyword_token_cache (tokenizer, text_hash, tokens)
+  VALUES (:tokenizer, :text_hash, :tokens)
+  ON CONFLICT (tokenizer, text_hash) DO NOTHING
+""")
+
+
+def cache_key(tokenizer) -> str:
+    """keyword_token_cache.tokenizer 값: backend 이름 + 설정 해시 (설정이 바뀌면 다른 키)"""
+    digest = hashlib.sha256(repr(tokenizer.config()).encode("utf-8")).hexdigest()[:12]
+    return f"{tokenizer.name}:{digest}"
+
+
+def content_hash(s: str) -> str:
+    """리뷰 본문 원문 그대로의 sha256 hex (토큰 결과가 원문에 따라 달라지므로 정규화하지 않음)"""
+    return hashlib.sha256((s or "").encode("utf-8")).hexdigest()
+
+
+class CachedTokenizer:
+    """
+    tokenizer + (LRU → keyword_token_cache 테이블) 캐시.
+    engine 이 None 이면 프로세스 내부 LRU 만 사용.
+
+    hit/miss 카운터는 SentimentCache 와 같은 의미:
+      - hits_memory / hits_db / misses
+    """
+
+    def __init__(self, tokenizer, engine=None, max_entries: int = 100_000):
+        self.tokenizer = tokenizer
+        self.name = tokenizer.name
+        self.key = cache_key(tokenizer)
+        self.engine = engine
+        self.lru = LRUCache(max_entries)
+        self.hits_memory = 0
+        self.hits_db = 0
+        self.misses = 0
+
+    def _lookup_db(self, hashes: List[str]) -> Dict[str, List[str]]:
+        if self.engine is None or not hashes:
+            return {}
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                LOOKUP_SQL, {"tokenizer": self.key, "hashes": hashes}
+            ).fetchall()
+        return {h: list(tokens) for h, tokens in rows}
+
+    def _store_db(self, results: Dict[str, List[str]]):
+        if self.engine is None or not results:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                STORE_SQL,
+                [
+                    {"tokenizer": self.key, "text_hash": h, "tokens": tokens}
+                    for h, tokens in results.items()
+                ],
+            )
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[List[str]]:
+        hashes = [content_hash(t) for t in texts]
+
+        found: Dict[str, List[str]] = {}
+        remaining = []
+        for h in dict.fromkeys(hashes):
+            tokens = self.lru.get(h)
+            if tokens is not None:
+                found[h] = tokens
+                self.hits_memory += 1
+            else:
+                remaining.append(h)
+
+        from_db = self._lookup_db(remaining)
+        for h, tokens in from_db.items():
+            self.lru.put(h, tokens)
+        found.update(from_db)
+        self.hits_db += len(from_db)
+
+        # 캐시에 없는 문장만 실제로 토큰화 (같은 문장은 1번만)
+        todo = {}
+        for h, t in zip(hashes, texts):
+            if h not in found and h not in todo:
+                todo[h] = t
+        self.misses += len(todo)
+        incr("token_cache_hits", len(found))
+        incr("token_cache_misses", len(todo))
+
+        if todo:
+            computed = dict(zip(todo, self.tokenizer.tokenize_many(list(todo.values()))))
+            for h, tokens in computed.items():
+                self.lru.put(h, tokens)
+            self._store_db(computed)
+            found.update(computed)
+
+        return [found[h] for h in hashes]
+
+    def tokenize(self, text: str) -> List[str]:
+        return self.tokenize_many([text])[0]
+
+    def summary(self) -> str:
+        total = self.hits_memory + self.hits_db + self.misses
+        hit_rate = (self.hits_memory + self.hits_db) / total * 100 if total else 0.0
+        return (
+            f"토큰 캐시 hit {self.hits_memory + self.hits_db}건 "
+            f"(memory {self.hits_memory}, db {self.hits_db}) / "
+            f"miss {self.misses}건, hit rate {hit_rate:.1f}%"
+        )
+
+
+def build_cached_tokenizer(name: str = DEFAULT_TOKENIZER, engine=None, use_cache: bool = True):
+    """
+    backend 생성 + (필요한 경우) 캐시 연결.
+    cacheable 이 아닌 backend (regex / josa) 나 use_cache=False 이면 캐시 없이 그대로 반환.
+    """
+    tokenizer = build_tokenizer(name)
+    if not use_cache or not tokenizer.cacheable:
+        return tokenizer
+    return CachedTokenizer(tokenizer, engine=engine)
+
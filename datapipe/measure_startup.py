@@ -0,0 +1,116 @@
+"""
+datapipe/measure_startup.py
+
+각 엔트리 포인트 모듈의 import 비용을 `python -X importtime` 으로 측정.
+
+  - 모듈마다 새 인터프리터에서 `import <module>` 만 실행
+  - 전체 import 시간(누적) + 가장 무거운 하위 모듈 top N 출력
+  - --output 을 주면 결과를 JSON 으로 저장 (실행 간 비교용)
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python measure_startup.py
+  python measure_startup.py --top 5 --output startup_importtime.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ENTRY_POINTS = [
+    "full_pipeline",
+    "batch_crawl_cameras",
+    "crawl_youtube_comments",
+    "label_with_model",
+    "analyze_keywords",
+]
+
+
+def measure(module: str, top: int = 10):
+    """
+    module 을 import 하는 데 걸린 시간(µs) 측정.
+    반환: { "module", "total_us", "wall_ms", "top": [(name, cumulative_us), ...] }
+    """
+    here = Path(__file__).resolve().parent
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+
+    started = datetime.now()
+    proc = subprocess.run(cmd, cwd=here, capture_output=True, text=True)
+    wall_ms = (datetime.now() - started).total_seconds() * 1000
+
+    # stderr 형식: "import time:   self [us] | cumulative | imported package"
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        cumulative = int(parts[1].strip())
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), cumulative, depth))
+
+    # 최상위(depth 0) import 들의 누적 시간 합 = 전체 import 시간
+    total_us = sum(c for _, c, d in entries if d == 0)
+    heaviest = sorted(
+        ((n, c) for n, c, d in entries if d <= 1), key=lambda x: x[1], reverse=True
+    )[:top]
+
+    # import 실패 시 traceback 마지막 줄 (importtime 출력은 제외)
+    error = None
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        error = errors[-1] if errors else f"exit code {proc.returncode}"
+
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "total_us": total_us,
+        "wall_ms": round(wall_ms, 1),
+        "top": heaviest,
+        "error": error,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top", type=int, default=10, help="모듈별로 보여줄 무거운 import 개수")
+    ap.add_argument("--output", help="결과 JSON 저장 경로")
+    ap.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    args = ap.parse_args()
+
+    results = []
+    for module in args.modules:
+        r = measure(module, top=args.top)
+        results.append(r)
+
+        status = "✅" if r["ok"] else "❌"
+        print(
+            f"{status} {module}: import {r['total_us'] / 1000:.1f} ms "
+            f"(인터프리터 포함 {r['wall_ms']:.0f} ms)"
+        )
+        if r["error"]:
+            print(f"     오류: {r['error']}")
+        for name, cumulative in r["top"]:
+            print(f"     - {name:<40} {cumulative / 1000:8.1f} ms")
+
+    if args.output:
+        payload = {
+            "measured_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "results": results,
+        }
+        Path(args.output).write_text(
+            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"📝 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
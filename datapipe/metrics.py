@@ -0,0 +1,310 @@
+"""
+datapipe/metrics.py
+
+파이프라인 단계별 계측 (full_pipeline.py 에서 사용).
+
+  - 단계(stage)별 wall time / CPU time (자식 프로세스 CPU 포함) / peak RSS
+  - 카운터: rows_in / rows_out / youtube_api_calls / db_statements / model_calls / cache_hits ...
+    (각 모듈은 incr() 만 호출, 현재 진행 중인 단계에 자동으로 집계)
+  - SQLAlchemy 로 실행되는 모든 SQL 문 수 (before_cursor_execute 이벤트)
+    psycopg2 cursor 를 직접 쓰는 execute_values / COPY 는 호출하는 쪽에서 incr("db_statements")
+  - 결과: JSON 실행 리포트 + (선택) Prometheus textfile collector 형식 파일
+
+사용 예:
+
+  from metrics import get_metrics, incr
+
+  m = get_metrics()
+  with m.stage("crawl"):
+      ...
+      incr("rows_out", 10)
+  m.write_json("metrics/run.json")
+  m.write_prometheus("/var/lib/node_exporter/textfile/camera_pipeline.prom")
+
+자식 프로세스(subprocess 로 실행한 스크립트)의 카운터는
+child_env() 로 넘긴 파일에 종료 시 기록되고, merge_child() 로 현재 단계에 합쳐진다.
+"""
+
+import atexit
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 자식 프로세스가 카운터를 기록할 파일 경로를 넘기는 환경 변수
+CHILD_SINK_ENV = "PIPELINE_METRICS_CHILD"
+
+# Prometheus metric 이름 접두사
+PROM_PREFIX = "camera_pipeline"
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """최대 RSS (MB). resource 모듈이 없는 OS 에서는 0"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux 는 KB, macOS 는 byte 단위
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _children_cpu() -> float:
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+class StageMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.wall_sec = 0.0
+        self.cpu_sec = 0.0
+        self.child_cpu_sec = 0.0
+        self.peak_rss_mb = 0.0
+        self.counters: Counter = Counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "wall_sec": round(self.wall_sec, 3),
+            "cpu_sec": round(self.cpu_sec, 3),
+            "child_cpu_sec": round(self.child_cpu_sec, 3),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "counters": dict(self.counters),
+        }
+
+
+class RunMetrics:
+    """실행 1회 분량의 단계/카운터 기록"""
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.stages: List[StageMetrics] = []
+        self.counters: Counter = Counter()   # 단계 밖에서 집계된 값 포함 전체 합계
+        self._current: Optional[StageMetrics] = None
+        self._start = time.perf_counter()
+        # 크롤링 스레드 / stream_pipeline 단계 스레드가 동시에 incr
+        self._lock = threading.Lock()
+
+    # ----- 기록 -----
+    def incr(self, name: str, n: int = 1):
+        if not n:
+            return
+        with self._lock:
+            self.counters[name] += n
+            if self._current is not None:
+                self._current.counters[name] += n
+
+    @contextmanager
+    def stage(self, name: str):
+        """with 블록 1개 = 단계 1개. 예외가 나면 status=error 로 기록 후 그대로 전파"""
+        st = StageMetrics(name)
+        self.stages.append(st)
+        prev, self._current = self._current, st
+
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        child0 = _children_cpu()
+        try:
+            yield st
+            st.status = "ok"
+        except BaseException as e:
+            st.status = "error"
+            st.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            st.wall_sec = time.perf_counter() - wall0
+            st.cpu_sec = time.process_time() - cpu0
+            st.child_cpu_sec = _children_cpu() - child0
+            st.peak_rss_mb = max(peak_rss_mb(), peak_rss_mb(children=True))
+            self._current = prev
+
+    # ----- 자식 프로세스 -----
+    def child_env(self, path) -> Dict[str, str]:
+        """subprocess 에 넘길 환경 변수 (자식이 종료 시 path 에 카운터 기록)"""
+        return {**os.environ, CHILD_SINK_ENV: str(path)}
+
+    def merge_child(self, path):
+        """자식 프로세스가 남긴 카운터를 현재 단계에 합침"""
+        path = Path(path)
+        if not path.exists():
+            return
+        try:
+            counters = json.loads(path.read_text(encoding="utf-8"))
+        finally:
+            path.unlink(missing_ok=True)
+        for name, n in counters.items():
+            self.incr(name, int(n))
+
+    # ----- 출력 -----
+    @property
+    def status(self) -> str:
+        if any(st.status == "error" for st in self.stages):
+            return "error"
+        return "ok"
+
+    def finish(self):
+        if self.finished_at is None:
+            self.finished_at = datetime.now(timezone.utc)
+
+    def to_dict(self) -> dict:
+        self.finish()
+        return {
+            "host": socket.gethostname(),
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat(),
+            "status": self.status,
+            "wall_sec": round(time.perf_counter() - self._start, 3),
+            "peak_rss_mb": round(max(peak_rss_mb(), peak_rss_mb(children=True)), 1),
+            "stages": [st.to_dict() for st in self.stages],
+            "counters": dict(self.counters),
+        }
+
+    def write_json(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    def to_prometheus(self) -> str:
+        report = self.to_dict()
+        p = PROM_PREFIX
+        lines = [
+            f"# HELP {p}_stage_duration_seconds 단계별 wall time",
+            f"# TYPE {p}_stage_duration_seconds gauge",
+        ]
+        for st in report["stages"]:
+            lines.append(f'{p}_stage_duration_seconds{{stage="{st["name"]}"}} {st["wall_sec"]}')
+
+        lines += [
+            f"# HELP {p}_stage_cpu_seconds 단계별 CPU time (자식 프로세스 포함)",
+            f"# TYPE {p}_stage_cpu_seconds gauge",
+        ]
+        for st in report["stages"]:
+            cpu = st["cpu_sec"] + st["child_cpu_sec"]
+            lines.append(f'{p}_stage_cpu_seconds{{stage="{st["name"]}"}} {cpu:.3f}')
+
+        lines += [
+            f"# HELP {p}_stage_success 단계 성공 여부 (1=성공)",
+            f"# TYPE {p}_stage_success gauge",
+        ]
+        for st in report["stages"]:
+            ok = 1 if st["status"] == "ok" else 0
+            lines.append(f'{p}_stage_success{{stage="{st["name"]}"}} {ok}')
+
+        lines += [
+            f"# HELP {p}_stage_events 단계별 카운터 (행 수, API 호출 수, SQL 문 수 ...)",
+            f"# TYPE {p}_stage_events gauge",
+        ]
+        for st in report["stages"]:
+            for name, n in sorted(st["counters"].items()):
+                lines.append(f'{p}_stage_events{{stage="{st["name"]}",name="{name}"}} {n}')
+
+        lines += [
+            f"# HELP {p}_peak_rss_megabytes 실행 중 최대 RSS",
+            f"# TYPE {p}_peak_rss_megabytes gauge",
+            f"{p}_peak_rss_megabytes {report['peak_rss_mb']}",
+            f"# HELP {p}_last_run_success 마지막 실행 성공 여부 (1=성공)",
+            f"# TYPE {p}_last_run_success gauge",
+            f"{p}_last_run_success {1 if report['status'] == 'ok' else 0}",
+            f"# HELP {p}_last_run_timestamp_seconds 마지막 실행 종료 시각",
+            f"# TYPE {p}_last_run_timestamp_seconds gauge",
+            f"{p}_last_run_timestamp_seconds {self.finished_at.timestamp():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """textfile collector 가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 rename"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for st in self.stages:
+            counters = ", ".join(f"{k}={v}" for k, v in sorted(st.counters.items()))
+            lines.append(
+                f"  • {st.name:<10} {st.status:<5} wall {st.wall_sec:7.2f}s "
+                f"cpu {st.cpu_sec + st.child_cpu_sec:7.2f}s  {counters}"
+            )
+        return lines
+
+
+_metrics: Optional[RunMetrics] = None
+
+
+def get_metrics() -> RunMetrics:
+    """프로세스 전체에서 공유하는 RunMetrics (첫 사용 시 생성)"""
+    global _metrics
+    if _metrics is None:
+        _metrics = RunMetrics()
+    return _metrics
+
+
+def reset_metrics() -> RunMetrics:
+    """새 실행 기록 시작 (daemon 처럼 한 프로세스에서 여러 번 실행할 때)"""
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
+
+
+def incr(name: str, n: int = 1):
+    get_metrics().incr(name, n)
+
+
+# -----------------------------
+# SQLAlchemy SQL 문 수
+# -----------------------------
+_db_hooked = False
+
+
+def instrument_sqlalchemy():
+    """모든 Engine 의 cursor execute 를 db_statements 로 집계 (1번만 등록)"""
+    global _db_hooked
+    if _db_hooked:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        incr("db_statements")
+
+    _db_hooked = True
+
+
+# -----------------------------
+# 자식 프로세스 측
+# -----------------------------
+def _dump_child_counters():
+    import multiprocessing
+
+    # 자식 스크립트가 다시 띄운 worker 프로세스(spawn)는 같은 파일을 덮어쓰지 않도록 제외
+    if multiprocessing.current_process().name != "MainProcess":
+        return
+    path = os.environ.get(CHILD_SINK_ENV)
+    if path and _metrics is not None:
+        Path(path).write_text(json.dumps(dict(_metrics.counters)), encoding="utf-8")
+
+
+if os.environ.get(CHILD_SINK_ENV):
+    instrument_sqlalchemy()
+    atexit.register(_dump_child_counters)
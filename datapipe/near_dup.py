@@ -0,0 +1,337 @@
+"""
+datapipe/near_dup.py
+
+"거의 같은" 댓글 탐지 (MinHash + LSH).
+
+UNIQUE(source, content) 는 같은 영상 안의 완전히 같은 댓글만 막기 때문에,
+여러 영상에 복사/붙여넣기 된 스팸이나 몇 글자만 바꾼 댓글이 그대로 라벨링/키워드 집계에 들어간다.
+
+  - 정규화한 본문의 글자 3-gram 집합 → MinHash signature (NUM_PERM 개)
+  - signature 를 BANDS 개 band 로 나눠 bucket 해시 → 같은 bucket 이면 후보
+  - 후보와의 추정 Jaccard 유사도가 NEAR_DUP_THRESHOLD 이상이면 중복
+
+사용처:
+  1) 크롤링 시 insert_reviews() 전에 filter_rows() 로 중복 댓글 제외
+     (삽입된 행의 signature 는 insert_reviews() 트랜잭션 안에서 같이 저장)
+     filter_rows() 는 커밋된 signature 만 후보로 보므로 크롤러는 필터 + INSERT 를 직렬화함
+       - 동기 크롤러 : 프로세스 안에서 threading.Lock (JobScheduler worker 스레드 사이)
+       - 동시 크롤러 : event loop 안에서 asyncio.Lock (비디오 / 카메라 job 사이)
+     남는 race: 크롤러 프로세스 여러 개가 동시에 돌면 서로의 INSERT 는 못 보고 통과할 수 있음
+  2) 이미 쌓인 행 일괄 처리 (review.duplicate_of 기록):
+
+       cd datapipe
+       source .venv/bin/activate
+       python near_dup.py --backfill
+
+     012_near_dup.sql 적용 직후 한 번 돌려두면 기존 행도 크롤링 시 원본 후보가 됨
+
+테이블: db-init/012_near_dup.sql (review_minhash, review_lsh_band, review.duplicate_of)
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from psycopg2.extras import execute_values
+from sqlalchemy import text
+
+from metrics import incr
+
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+SHINGLE_SIZE = 3
+
+# 추정 Jaccard 유사도가 이 값 이상이면 중복
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+
+# 정규화 후 이 길이보다 짧은 댓글은 검사하지 않음
+# (짧은 문장은 서로 다른 사람이 써도 쉽게 비슷해짐, 완전 중복은 UNIQUE 제약이 처리)
+NEAR_DUP_MIN_CHARS = int(os.environ.get("NEAR_DUP_MIN_CHARS", "20"))
+
+BACKFILL_BATCH = 2000
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# 실행마다 같은 signature 가 나오도록 고정 seed
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+_NON_WORD_RE = re.compile(r"[^0-9가-힣a-z]")
+
+
+def shingles(text: str) -> set:
+    """소문자 + 한글/영어/숫자만 남긴 본문의 글자 SHINGLE_SIZE-gram 집합"""
+    t = _NON_WORD_RE.sub("", unicodedata.normalize("NFC", text or "").lower())
+    if len(t) < NEAR_DUP_MIN_CHARS:
+        return set()
+    return {t[i:i + SHINGLE_SIZE] for i in range(len(t) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM 개의 uint32 signature (검사 대상이 아닌 짧은 댓글은 None)"""
+    sh = shingles(text)
+    if not sh:
+        return None
+    hv = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in sh), dtype=np.uint64, count=len(sh)
+    )
+    # (a * x + b) mod p 를 permutation 별로 한 번에 계산 (uint64 overflow 는 의도된 것)
+    with np.errstate(over="ignore"):
+        phv = (_PERM_A[:, None] * hv[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return phv.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(sig: np.ndarray) -> List[int]:
+    """band 별 bucket 값 (BIGINT 에 들어가도록 signed 64bit)"""
+    raw = sig.astype("<u4").tobytes()
+    step = ROWS_PER_BAND * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(raw[i * step:(i + 1) * step], digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+        for i in range(BANDS)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """두 signature 의 추정 Jaccard 유사도"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def from_bytes(raw) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype="<u4")
+
+
+# -----------------------------
+# DB
+# -----------------------------
+CANDIDATES_SQL = text("""
+  SELECT b.band, b.bucket, b.review_id, m.signature
+    FROM review_lsh_band b
+    JOIN review_minhash m
+      ON m.review_id = b.review_id
+   WHERE (b.band, b.bucket) IN (
+         SELECT * FROM unnest(CAST(:bands AS smallint[]), CAST(:buckets AS bigint[]))
+   )
+""")
+
+STORE_SIGNATURE_SQL = """
+    INSERT INTO review_minhash (review_id, signature)
+    VALUES %s
+    ON CONFLICT (review_id) DO NOTHING
+"""
+
+STORE_BANDS_SQL = """
+    INSERT INTO review_lsh_band (band, bucket, review_id)
+    VALUES %s
+    ON CONFLICT DO NOTHING
+"""
+
+SELECT_BACKFILL_SQL = text("""
+  SELECT r.id, r.content
+    FROM review r
+    LEFT JOIN review_minhash m
+      ON m.review_id = r.id
+   WHERE r.id > :last_id
+     AND m.review_id IS NULL
+     AND r.content IS NOT NULL
+   ORDER BY r.id
+   LIMIT :limit
+""")
+
+MARK_DUPLICATES_SQL = text("""
+  UPDATE review r
+     SET duplicate_of = d.original_id
+    FROM unnest(CAST(:ids AS integer[]), CAST(:originals AS integer[])) AS d(id, original_id)
+   WHERE r.id = d.id
+     AND r.duplicate_of IS DISTINCT FROM d.original_id
+""")
+
+
+class NearDupIndex:
+    """
+    LSH bucket → 원본 후보 (DB 에 저장된 행 + 같은 배치에서 먼저 처리한 행).
+
+      idx = NearDupIndex()
+      idx.prefetch(conn, [band_buckets(sig), ...])  → 배치 전체의 DB 후보를 쿼리 1번으로 로드
+      original = idx.find(sig, buckets)            → 중복이면 원본 key, 아니면 None
+      idx.add(key, sig, buckets)                   → 이후 같은 배치에서 후보로 사용
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[Tuple[int, int], List[Tuple[object, np.ndarray]]] = {}
+
+    def prefetch(self, conn, bucket_lists: Sequence[List[int]]):
+        pairs = {(band, bucket) for buckets in bucket_lists for band, bucket in enumerate(buckets)}
+        if not pairs:
+            return
+        bands, buckets = zip(*pairs)
+        rows = conn.execute(
+            CANDIDATES_SQL, {"bands": list(bands), "buckets": list(buckets)}
+        ).fetchall()
+        for band, bucket, rid, raw in rows:
+            self._buckets.setdefault((band, bucket), []).append((rid, from_bytes(raw)))
+
+    def find(self, sig: np.ndarray, buckets: List[int], before=None):
+        """
+        sig 와 추정 유사도가 threshold 이상인 가장 오래된(작은 id) 원본.
+        before 를 주면 그보다 작은 id 만 원본 후보로 봄 (backfill 에서 자기 자신/이후 행 제외)
+        """
+        matches = set()
+        for band, bucket in enumerate(buckets):
+            for key, other in self._buckets.get((band, bucket), ()):
+                if key in matches:
+                    continue
+                if before is not None and isinstance(key, int) and key >= before:
+                    continue
+                if similarity(sig, other) >= self.threshold:
+                    matches.add(key)
+        if not matches:
+            return None
+        ids = [k for k in matches if isinstance(k, int)]
+        return min(ids) if ids else next(iter(matches))
+
+    def add(self, key, sig: np.ndarray, buckets: List[int]):
+        for band, bucket in enumerate(buckets):
+            self._buckets.setdefault((band, bucket), []).append((key, sig))
+
+
+def store_signatures(cur, items: Sequence[Tuple[int, np.ndarray]], canonical: bool = True):
+    """
+    (review_id, signature) 저장. canonical=True 면 LSH band 에도 등록 (이후 원본 후보가 됨)
+    cur: psycopg2 cursor (호출하는 쪽 트랜잭션 안에서 실행)
+    """
+    if not items:
+        return
+    execute_values(cur, STORE_SIGNATURE_SQL, [(rid, to_bytes(sig)) for rid, sig in items])
+    if canonical:
+        execute_values(
+            cur,
+            STORE_BANDS_SQL,
+            [
+                (band, bucket, rid)
+                for rid, sig in items
+                for band, bucket in enumerate(band_buckets(sig))
+            ],
+            page_size=1000,
+        )
+
+
+def filter_rows(engine, rows: List[dict]) -> Tuple[List[dict], int]:
+    """
+    insert_reviews() 용 rows 에서 이미 저장된 리뷰 / 같은 배치의 앞선 행과 거의 같은 행 제거.
+    남은 행에는 "minhash" 키로 signature 를 붙여둠 (insert_reviews 가 저장)
+    반환: (남은 rows, 제외한 행 수)
+    """
+    if not rows:
+        return rows, 0
+
+    sigs = [minhash(r["content"]) for r in rows]
+    buckets = [band_buckets(sig) if sig is not None else None for sig in sigs]
+
+    index = NearDupIndex()
+    with engine.connect() as conn:
+        index.prefetch(conn, [b for b in buckets if b is not None])
+
+    kept = []
+    dropped = 0
+    for i, (r, sig, bk) in enumerate(zip(rows, sigs, buckets)):
+        if sig is None:
+            kept.append(r)
+            continue
+        if index.find(sig, bk) is not None:
+            dropped += 1
+            continue
+        index.add(("batch", i), sig, bk)
+        kept.append({**r, "minhash": sig})
+    incr("near_duplicates", dropped)
+    return kept, dropped
+
+
+def backfill(engine, batch_size: int = BACKFILL_BATCH):
+    """
+    signature 가 없는 기존 행을 id 순서로 훑으면서
+    더 먼저 들어온 리뷰와 거의 같은 행에 review.duplicate_of 기록.
+    배치마다 커밋 → 중간에 멈춰도 다음 실행에서 이어서 처리
+    """
+    last_id = 0
+    total = 0
+    total_dups = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                SELECT_BACKFILL_SQL, {"last_id": last_id, "limit": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+
+            sigs = [minhash(content) for _, content in rows]
+            buckets = [band_buckets(sig) if sig is not None else None for sig in sigs]
+
+            index = NearDupIndex()
+            index.prefetch(conn, [b for b in buckets if b is not None])
+
+            originals = []
+            duplicates = []
+            dup_ids = []
+            dup_originals = []
+
+            for (rid, _), sig, bk in zip(rows, sigs, buckets):
+                if sig is None:
+                    # 검사 대상이 아닌 짧은 댓글도 처리 완료로 기록 (빈 signature)
+                    duplicates.append((rid, np.zeros(0, dtype=np.uint32)))
+                    continue
+                original = index.find(sig, bk, before=rid)
+                if original is None:
+                    index.add(rid, sig, bk)
+                    originals.append((rid, sig))
+                else:
+                    duplicates.append((rid, sig))
+                    dup_ids.append(rid)
+                    dup_originals.append(original)
+
+            with conn.connection.driver_connection.cursor() as cur:
+                store_signatures(cur, originals, canonical=True)
+                store_signatures(cur, duplicates, canonical=False)
+
+            if dup_ids:
+                conn.execute(MARK_DUPLICATES_SQL, {"ids": dup_ids, "originals": dup_originals})
+
+        last_id = rows[-1][0]
+        total += len(rows)
+        total_dups += len(dup_ids)
+        print(f"  ▶ id <= {last_id}: {total}건 처리, 중복 {total_dups}건")
+
+    print(f"✅ near-duplicate backfill 완료: {total}건 중 중복 {total_dups}건")
+
+
+if __name__ == "__main__":
+    from db import get_engine
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backfill", action="store_true", help="기존 review 행 일괄 중복 검사")
+    ap.add_argument("--batch-size", type=int, default=BACKFILL_BATCH)
+    args = ap.parse_args()
+
+    if args.backfill:
+        backfill(get_engine(), batch_size=args.batch_size)
+    else:
+        ap.print_help()
@@ -0,0 +1,169 @@
+"""
+datapipe/noise_filter.py
+
+크롤링한 댓글 노이즈 필터 (crawl_youtube_comments.is_noise_comment 의 본체).
+
+규칙은 위에서부터 순서대로 검사하고, 처음 걸린 규칙 이름을 제외 사유로 기록한다.
+  - empty             : 빈 댓글
+  - too_short         : 10자 미만
+  - greeting          : 인사/감사 패턴 포함 ("잘 보고 갑니다", "감사합니다" ...)
+  - emoji_only        : 이모지/ㅋ/ㅎ 만 있음
+  - no_camera_keyword : 카메라 관련 키워드가 하나도 없음
+
+키워드 목록은 NoiseFilter 생성 시 1번만 컴파일한다.
+  - pyahocorasick 이 설치돼 있으면 Aho-Corasick automaton
+  - 없으면 키워드 trie 를 그대로 옮긴 정규식 1개
+    (위치마다 키워드 수가 아니라 trie 깊이만큼만 비교 → 키워드가 늘어도 거의 O(len(text)))
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+MIN_LENGTH = 10
+
+NOISE_PATTERNS = (
+    "잘 보고 갑니다", "잘봤습니다", "잘 봤습니다",
+    "영상 감사합니다", "감사합니다", "감사해요",
+    "굿", "좋아요", "좋은 영상", "쿠팡",
+    "고맙습니다", "덕분에", "수고하셨습니다", "?",
+)
+
+CAMERA_KEYWORDS = (
+    "af", "오토포커스", "노이즈", "색감", "화이트밸런스",
+    "화질", "디테일", "iso", "셔터", "조리개",
+    "연사", "동영상", "발열", "손떨림", "ois", "렌즈",
+    "고감도", "dr", "다이내믹", "초점", "트래킹",
+    "센서", "바디", "프레임", "필름", "사진", "촬영",
+    "흔들림", "저조도", "후지", "캐논", "소니", "니콘",
+)
+
+# 예: "ㅋㅋㅋㅋㅋㅋ", "ㅎㅎㅎㅎ", "🙏🙏😍"
+EMOJI_ONLY_RE = re.compile(r"[ㅋㅎㅠㅜ🙏❤️💜💙💚💛🤍🤎🖤⭐✨🔥\s]+")
+
+RULES = ("empty", "too_short", "greeting", "emoji_only", "no_camera_keyword")
+
+# format_rejections 출력 순서 (near_duplicate 는 near_dup.py 에서 집계)
+REPORT_ORDER = RULES + ("near_duplicate",)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    키워드 목록 → 공통 접두사를 묶은 정규식
+    예: ["감사합니다", "감사해요"] → "감사(?:합니다|해요)"
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        if "" in node and len(node) == 1:
+            return ""
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        optional = "" in node
+        if len(alts) == 1 and not optional:
+            return alts[0]
+        pattern = "(?:" + "|".join(alts) + ")"
+        return pattern + "?" if optional else pattern
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """키워드 중 하나라도 포함돼 있는지 검사 (생성 시 1번만 컴파일)"""
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = tuple(keywords)
+        try:
+            import ahocorasick
+        except ImportError:
+            ahocorasick = None
+
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for k in self.keywords:
+                automaton.add_word(k, k)
+            automaton.make_automaton()
+            self._automaton = automaton
+            self._regex = None
+            self.kind = "aho-corasick"
+        else:
+            self._automaton = None
+            self._regex = re.compile(_trie_pattern(self.keywords))
+            self.kind = "regex"
+
+    def search(self, t: str) -> bool:
+        if self._automaton is not None:
+            return next(self._automaton.iter(t), None) is not None
+        return self._regex.search(t) is not None
+
+
+class NoiseFilter:
+    """
+    리뷰와 무관한 '노이즈 댓글' 판정기.
+
+      nf = NoiseFilter()
+      nf.reason(text)                   → 제외 사유 (노이즈 아니면 None)
+      keep, rejected = nf.filter_batch(texts)
+                                        → 댓글 1페이지를 한 번에 판정
+                                          keep: bool 리스트, rejected: 규칙별 Counter
+    """
+
+    def __init__(
+        self,
+        noise_patterns: Sequence[str] = NOISE_PATTERNS,
+        camera_keywords: Sequence[str] = CAMERA_KEYWORDS,
+        min_length: int = MIN_LENGTH,
+    ):
+        self.min_length = min_length
+        self.greeting = KeywordMatcher(noise_patterns)
+        self.camera = KeywordMatcher(camera_keywords)
+
+    def reason(self, text: Optional[str]) -> Optional[str]:
+        if not text:
+            return "empty"
+
+        t = text.strip().lower()
+
+        # ----- 1) 길이 기반 필터 (너무 짧은 댓글은 리뷰일 가능성 낮음)
+        if len(t) < self.min_length:
+            return "too_short"
+
+        # ----- 2) 인사/감사 패턴 필터
+        if self.greeting.search(t):
+            return "greeting"
+
+        # ----- 3) 거의 이모지/ㅋ/ㅎ 만 있는 댓글
+        if EMOJI_ONLY_RE.fullmatch(t):
+            return "emoji_only"
+
+        # ----- 4) 카메라 관련 키워드가 하나도 없으면 noise 가능성 ↑↑
+        if not self.camera.search(t):
+            return "no_camera_keyword"
+
+        # noise 아님 → 리뷰일 가능성 있음
+        return None
+
+    def is_noise(self, text: Optional[str]) -> bool:
+        return self.reason(text) is not None
+
+    def filter_batch(self, texts: Iterable[Optional[str]]) -> Tuple[List[bool], Counter]:
+        keep: List[bool] = []
+        rejected: Counter = Counter()
+        for t in texts:
+            r = self.reason(t)
+            keep.append(r is None)
+            if r is not None:
+                rejected[r] += 1
+        return keep, rejected
+
+
+def format_rejections(rejected: Counter) -> str:
+    """규칙별 제외 수 → '총 12건 (too_short 5, greeting 4, ...)'"""
+    total = sum(rejected.values())
+    detail = ", ".join(f"{rule} {rejected[rule]}" for rule in REPORT_ORDER if rejected.get(rule))
+    return f"총 {total}건 ({detail})" if detail else f"총 {total}건"
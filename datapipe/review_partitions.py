@@ -0,0 +1,92 @@
+"""
+datapipe/review_partitions.py
+
+review 월 단위 파티션 관리 (db-init/015_review_partitioning.sql).
+
+파티션 키는 수집 시각 ingested_at (INSERT 된 시각).
+created_at 은 댓글 작성 시각(YouTube publishedAt)이라 오래된 영상에 새로 달린 댓글도 과거 달이 되므로
+"최근에 들어온 리뷰" 기준으로 쓰지 않는다.
+
+  - ensure_partitions() : 이번 달부터 N개월 뒤까지 파티션을 미리 생성
+                          (batch_crawl_cameras.run_batch 가 크롤링 전에 호출,
+                           없는 달의 행은 review_default 로 들어갔다가 파티션이 생길 때 옮겨짐)
+  - recent_since()      : --recent-months N → ingested_at 하한 (N개월 전 달의 1일)
+                          쿼리에 상수로 들어가므로 planner 가 그 이전 파티션은 읽지 않음
+
+창 밖 행의 처리:
+  - 라벨링       : 라벨이 없는 채로 backlog 에 남고, 창 없이 실행할 때 처리됨
+  - 키워드 증분  : 창 밖에서 라벨이 바뀐 행이 있으면 watermark 를 그 앞에 묶어둠
+                   (analyze_keywords.main_incremental, 창 없이 실행하면 반영되고 풀림)
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python review_partitions.py                  # 파티션 생성 + 파티션별 행 수(추정) 출력
+  python review_partitions.py --months-ahead 6
+
+환경 변수:
+  - REVIEW_PARTITION_MONTHS_AHEAD : 미리 만들 파티션 개월 수 (기본 3)
+"""
+
+import argparse
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text
+
+from db import get_engine
+
+MONTHS_AHEAD = int(os.environ.get("REVIEW_PARTITION_MONTHS_AHEAD", "3"))
+
+ENSURE_PARTITIONS_SQL = text("SELECT ensure_review_partitions(:months_ahead)")
+
+LIST_PARTITIONS_SQL = text("""
+  SELECT c.relname,
+         pg_get_expr(c.relpartbound, c.oid) AS bound,
+         c.reltuples
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+   WHERE i.inhparent = 'review'::regclass
+   ORDER BY c.relname
+""")
+
+
+def ensure_partitions(months_ahead: int = MONTHS_AHEAD, engine=None) -> int:
+    """이번 달 ~ months_ahead 개월 뒤 파티션을 만들고 새로 만든 개수 반환"""
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        created = int(conn.execute(ENSURE_PARTITIONS_SQL, {"months_ahead": months_ahead}).scalar_one())
+    if created:
+        print(f"🗂️ review 월 파티션 {created}개 생성")
+    return created
+
+
+def recent_since(months: int, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    최근 months 개월 (이번 달 포함) 의 ingested_at 하한. months <= 0 이면 None (전체).
+    ingested_at 은 DB 의 now() (기본 시간대 UTC) 로 채워지므로 UTC 로 계산.
+    """
+    if months <= 0:
+        return None
+    now = now or datetime.utcnow()
+    total = now.year * 12 + (now.month - 1) - (months - 1)
+    return datetime(total // 12, total % 12 + 1, 1)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD, help="미리 만들 파티션 개월 수")
+    args = ap.parse_args()
+
+    ensure_partitions(args.months_ahead)
+
+    with get_engine().connect() as conn:
+        rows = conn.execute(LIST_PARTITIONS_SQL).fetchall()
+
+    print("📊 review 파티션")
+    for name, bound, reltuples in rows:
+        # reltuples 는 ANALYZE 전이면 -1
+        est = f"{int(reltuples)}" if reltuples >= 0 else "?"
+        print(f"  • {name}: {bound} (약 {est}행)")
@@ -0,0 +1,169 @@
+"""
+datapipe/sentiment_backends.py
+
+감성 분석 모델 추론 backend 선택.
+
+  - pytorch : 기존 FP32 PyTorch 파이프라인 (기본값)
+  - int8    : torch dynamic quantization (nn.Linear → int8), CPU 전용
+  - onnx    : optimum 으로 export 한 ONNX Runtime 모델, CPU 전용
+
+라벨링 결과(review.sentiment_model, sentiment_cache.model)에는
+backend 별로 구분되는 모델 태그를 저장한다. (예: "...Korean-sentiment@int8")
+
+FP32 대비 정확도 확인 (parity check):
+
+  cd datapipe
+  source .venv/bin/activate
+  python sentiment_backends.py --backend int8 --sample 500
+  python sentiment_backends.py --backend onnx --sample 500
+"""
+
+import os
+import time
+import argparse
+from pathlib import Path
+
+BACKENDS = ("pytorch", "int8", "onnx")
+
+# ONNX export 결과를 저장해둘 폴더 (최초 1회만 export)
+ONNX_EXPORT_DIR = Path(
+    os.environ.get(
+        "SENTIMENT_ONNX_DIR",
+        str(Path(__file__).resolve().parent / ".onnx"),
+    )
+)
+
+
+def model_tag(model_name: str, backend: str) -> str:
+    """DB에 저장할 모델 식별자 (FP32 는 기존 모델명 그대로)"""
+    if backend == "pytorch":
+        return model_name
+    return f"{model_name}@{backend}"
+
+
+def build_classifier(model_name: str, backend: str = "pytorch"):
+    """
+    backend 에 맞는 text-classification 파이프라인 생성.
+    optimum / onnxruntime 은 onnx backend 를 쓸 때만 필요.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 backend: {backend} (가능: {', '.join(BACKENDS)})")
+
+    from transformers import pipeline
+
+    if backend == "pytorch":
+        return pipeline(
+            "text-classification",
+            model=model_name,
+            tokenizer=model_name,
+            # device를 따로 지정하지 않으면
+            # 가능한 경우 MPS/GPU, 아니면 CPU를 자동 선택
+        )
+
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == "int8":
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return pipeline("text-classification", model=model, tokenizer=tokenizer, device=-1)
+
+    # onnx
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise RuntimeError(
+            "onnx backend 를 쓰려면 optimum[onnxruntime] 패키지를 설치하세요."
+        ) from e
+
+    export_dir = ONNX_EXPORT_DIR / model_name.replace("/", "__")
+    if (export_dir / "model.onnx").exists():
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+    else:
+        print(f"📦 ONNX export 중 → {export_dir}")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, device=-1)
+
+
+# -----------------------------
+# FP32 대비 parity check
+# -----------------------------
+def load_parity_sample(n: int):
+    """review 테이블에서 무작위 n건 (라벨링 여부와 무관) 로드"""
+    from sqlalchemy import text
+    from db import get_engine
+
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text(
+                """
+                SELECT content
+                  FROM review
+                 WHERE content IS NOT NULL
+                   AND TRIM(content) <> ''
+                 ORDER BY random()
+                 LIMIT :n
+                """
+            ),
+            {"n": n},
+        ).scalars().all()
+    return [r.strip() for r in rows]
+
+
+def _predict(clf, texts, batch_size: int, max_len: int):
+    from label_with_model import map_to_label
+
+    start = time.perf_counter()
+    preds = clf(texts, batch_size=batch_size, truncation=True, max_length=max_len)
+    elapsed = time.perf_counter() - start
+    return [map_to_label(p) for p in preds], elapsed
+
+
+def parity_check(backend: str, sample: int = 500, batch_size: int = 32):
+    """
+    FP32(pytorch) 대비 backend 결과 비교:
+      - 라벨 일치율 (positive / neutral / negative)
+      - positive 확률 차이 (평균 / p95 / 최대)
+      - rows/sec
+    """
+    from label_with_model import MAX_LEN, MODEL_NAME
+
+    texts = [t[:MAX_LEN] for t in load_parity_sample(sample)]
+    if not texts:
+        print("비교할 리뷰가 없습니다.")
+        return
+
+    print(f"🔬 parity check: pytorch(FP32) vs {backend}, 샘플 {len(texts)}건")
+
+    base, base_sec = _predict(build_classifier(MODEL_NAME, "pytorch"), texts, batch_size, MAX_LEN)
+    cand, cand_sec = _predict(build_classifier(MODEL_NAME, backend), texts, batch_size, MAX_LEN)
+
+    agree = sum(1 for (l1, _), (l2, _) in zip(base, cand) if l1 == l2)
+    drifts = sorted(abs(s1 - s2) for (_, s1), (_, s2) in zip(base, cand))
+    p95 = drifts[min(len(drifts) - 1, int(len(drifts) * 0.95))]
+
+    print(f"  • 라벨 일치율     : {agree / len(texts) * 100:.2f}% ({agree}/{len(texts)})")
+    print(f"  • 점수 차이 평균  : {sum(drifts) / len(drifts):.4f}")
+    print(f"  • 점수 차이 p95   : {p95:.4f}")
+    print(f"  • 점수 차이 최대  : {drifts[-1]:.4f}")
+    print(f"  • 속도 (rows/sec) : pytorch {len(texts) / base_sec:.1f} / {backend} {len(texts) / cand_sec:.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", choices=[b for b in BACKENDS if b != "pytorch"], required=True)
+    ap.add_argument("--sample", type=int, default=500, help="비교에 사용할 리뷰 수")
+    ap.add_argument("--batch-size", type=int, default=32)
+    args = ap.parse_args()
+
+    parity_check(args.backend, sample=args.sample, batch_size=args.batch_size)
@@ -0,0 +1,160 @@
+"""
+datapipe/sentiment_cache.py
+
+감성 분석 결과 캐시.
+
+같은 댓글 문장이 여러 영상에 반복해서 달리는 경우가 많아서
+(UNIQUE(source, content) 는 영상 단위로만 중복을 막음)
+(모델명, 정규화된 문장 해시) 기준으로 예측 결과를 재사용한다.
+
+  1) 프로세스 내부 LRU (dict 조회 수준)
+  2) PostgreSQL sentiment_cache 테이블 (실행/프로세스 간 공유)
+  3) 둘 다 없으면 모델 호출 → 결과를 1), 2)에 저장
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+
+from metrics import incr
+
+
+# 캐시 키 계산 시 사용할 최대 문자 수 (label_with_model.MAX_LEN 과 동일하게 유지)
+#  → 모델이 어차피 잘라서 보는 뒷부분은 키에 포함하지 않음
+KEY_MAX_LEN = 512
+
+# 프로세스 내부 LRU 최대 항목 수
+LRU_MAX_ENTRIES = 100_000
+
+
+LOOKUP_SQL = text("""
+  SELECT text_hash, sentiment_label, sentiment_score
+    FROM sentiment_cache
+   WHERE model = :model
+     AND text_hash = ANY(:hashes)
+""")
+
+STORE_SQL = text("""
+  INSERT INTO sentiment_cache (model, text_hash, sentiment_label, sentiment_score)
+  VALUES (:model, :text_hash, :label, :score)
+  ON CONFLICT (model, text_hash) DO NOTHING
+""")
+
+
+def normalize_text(s: str) -> str:
+    """
+    캐시 키용 정규화:
+      - 유니코드 NFC 정규화
+      - 연속 공백 → 1칸, 앞뒤 공백 제거
+      - KEY_MAX_LEN 까지만 사용
+    (모델이 cased 라서 대소문자는 그대로 둠)
+    """
+    s = unicodedata.normalize("NFC", s or "")
+    s = re.sub(r"\s+", " ", s).strip()
+    return s[:KEY_MAX_LEN]
+
+
+def text_hash(s: str) -> str:
+    """정규화된 문장의 sha256 hex"""
+    return hashlib.sha256(normalize_text(s).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """OrderedDict 기반의 단순 LRU"""
+
+    def __init__(self, max_entries: int = LRU_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Tuple[str, float]):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SentimentCache:
+    """
+    (model, text_hash) → (sentiment_label, positive_prob) 캐시.
+
+    hit/miss 카운터:
+      - hits_memory : 프로세스 내부 LRU 에서 찾음
+      - hits_db     : sentiment_cache 테이블에서 찾음
+      - misses      : 모델 호출이 필요한 키
+    """
+
+    def __init__(self, engine, model: str, max_entries: int = LRU_MAX_ENTRIES):
+        self.engine = engine
+        self.model = model
+        self.lru = LRUCache(max_entries)
+        self.hits_memory = 0
+        self.hits_db = 0
+        self.misses = 0
+
+    def lookup_many(self, hashes: Iterable[str]) -> Dict[str, Tuple[str, float]]:
+        """캐시에 있는 키만 골라서 {hash: (label, prob)} 로 반환"""
+        found: Dict[str, Tuple[str, float]] = {}
+        remaining = []
+
+        for h in set(hashes):
+            value = self.lru.get(h)
+            if value is not None:
+                found[h] = value
+                self.hits_memory += 1
+            else:
+                remaining.append(h)
+
+        if remaining:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    LOOKUP_SQL, {"model": self.model, "hashes": remaining}
+                ).fetchall()
+            for h, label, score in rows:
+                value = (label, float(score))
+                self.lru.put(h, value)
+                found[h] = value
+            self.hits_db += len(rows)
+            self.misses += len(remaining) - len(rows)
+            incr("cache_misses", len(remaining) - len(rows))
+
+        incr("cache_hits", len(found))
+        return found
+
+    def store_many(self, results: Dict[str, Tuple[str, float]]):
+        """새로 예측한 결과를 LRU + sentiment_cache 테이블에 저장"""
+        if not results:
+            return
+
+        for h, value in results.items():
+            self.lru.put(h, value)
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                STORE_SQL,
+                [
+                    {"model": self.model, "text_hash": h, "label": label, "score": score}
+                    for h, (label, score) in results.items()
+                ],
+            )
+
+    def summary(self) -> str:
+        total = self.hits_memory + self.hits_db + self.misses
+        hit_rate = (self.hits_memory + self.hits_db) / total * 100 if total else 0.0
+        return (
+            f"캐시 hit {self.hits_memory + self.hits_db}건 "
+            f"(memory {self.hits_memory}, db {self.hits_db}) / "
+            f"miss {self.misses}건, hit rate {hit_rate:.1f}%"
+        )
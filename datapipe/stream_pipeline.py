@@ -0,0 +1,265 @@
+"""
+datapipe/stream_pipeline.py
+
+스트리밍 파이프라인 (full_pipeline.py --streaming).
+
+크롤링이 끝날 때까지 기다리지 않고, 새로 INSERT 된 review.id 를
+단계별 스레드로 바로 흘려보낸다.
+
+  crawl 스레드 ──(새 review.id)──▶ label 큐 ──▶ label 스레드 ──(라벨 붙은 id)──▶ keyword 큐 ──▶ keyword 스레드
+  (run_batch)                                  (label_ids)                                    (main_incremental)
+
+  - 큐는 크기 제한이 있어서 뒤 단계가 밀리면 앞 단계가 기다림 (backpressure)
+  - label 스레드 : id 를 STREAM_LABEL_BATCH 개 또는 STREAM_LABEL_FLUSH_SEC 초 단위로 모아서 라벨링
+                  (모델은 스레드 시작 시 미리 로드 → 첫 묶음이 모델 로드를 기다리지 않음)
+  - keyword 스레드: 라벨 결과를 STREAM_KEYWORD_FLUSH_SEC 초 동안 모아서 증분 집계 1번
+                  (증분 집계는 watermark 기준이라 나눠서 불러도 결과가 같고,
+                   매번 전체 top_k 를 다시 계산하므로 너무 자주 부르지 않음)
+  - 크롤링이 끝나면 큐를 모두 비운 뒤,
+    스트림에서 빠진 행(이전 실행 backlog, 라벨링 실패 묶음 등)을 한 번 더 훑고 마지막 집계
+    (recent_months 는 이 backlog 라벨링에만 적용)
+
+모델 추론은 torch 가 내부 스레드로 병렬화하므로 label 단계는 스레드 1개로 돌린다.
+
+실행 방법:
+
+  cd datapipe
+  source .venv/bin/activate
+  python stream_pipeline.py
+  python stream_pipeline.py --concurrent     # 크롤링은 asyncio 동시 크롤링 엔진 사용
+
+환경 변수:
+  - STREAM_LABEL_QUEUE        : label 큐 크기 (비디오 단위 id 묶음 수, 기본 64)
+  - STREAM_KEYWORD_QUEUE      : keyword 큐 크기 (라벨링 묶음 수, 기본 64)
+  - STREAM_LABEL_BATCH        : 한 번에 라벨링할 최대 id 수 (기본 256)
+  - STREAM_LABEL_FLUSH_SEC    : id 가 덜 모여도 라벨링을 시작하는 대기 시간 (기본 5초)
+  - STREAM_KEYWORD_FLUSH_SEC  : 키워드 증분 집계 간격 (기본 60초)
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from typing import List, Tuple
+
+import label_with_model
+from analyze_keywords import main_incremental as analyze_keywords_incremental
+from batch_crawl_cameras import CRAWL_CONCURRENT, run_batch
+
+LABEL_QUEUE_SIZE = int(os.environ.get("STREAM_LABEL_QUEUE", "64"))
+KEYWORD_QUEUE_SIZE = int(os.environ.get("STREAM_KEYWORD_QUEUE", "64"))
+LABEL_BATCH = int(os.environ.get("STREAM_LABEL_BATCH", "256"))
+LABEL_FLUSH_SEC = float(os.environ.get("STREAM_LABEL_FLUSH_SEC", "5"))
+KEYWORD_FLUSH_SEC = float(os.environ.get("STREAM_KEYWORD_FLUSH_SEC", "60"))
+
+# 앞 단계가 끝났다는 표시 (큐의 마지막 항목)
+_DONE = object()
+
+# 큐 항목: (review.id 리스트, 첫 id 가 INSERT 된 시각 time.monotonic())
+Item = Tuple[List[int], float]
+
+
+class StreamStats:
+    """스레드 간 공유하는 처리 현황"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inserted = 0
+        self.labeled = 0
+        self.failed = 0
+        self.keyword_runs = 0
+        self.max_latency_sec = 0.0
+        self.errors: List[str] = []
+
+    def add(self, **kwargs):
+        with self._lock:
+            for name, n in kwargs.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def observe_latency(self, sec: float):
+        with self._lock:
+            self.max_latency_sec = max(self.max_latency_sec, sec)
+
+    def error(self, stage: str, e: BaseException):
+        with self._lock:
+            self.errors.append(f"{stage}: {type(e).__name__}: {e}")
+
+
+def _collect(q: "queue.Queue", max_ids: int, flush_sec: float) -> Tuple[List[Item], bool]:
+    """
+    q 에서 항목을 모음.
+      - 첫 항목은 올 때까지 기다림
+      - 이후 id 가 max_ids 개 이상이 되거나 flush_sec 초가 지나면 반환
+    반환: (모은 항목들, 앞 단계 종료 여부)
+    """
+    first = q.get()
+    if first is _DONE:
+        return [], True
+
+    items = [first]
+    n = len(first[0])
+    deadline = time.monotonic() + flush_sec
+    while n < max_ids:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = q.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is _DONE:
+            return items, True
+        items.append(item)
+        n += len(item[0])
+    return items, False
+
+
+# -----------------------------
+# 단계별 스레드
+# -----------------------------
+def crawl_stage(label_q: "queue.Queue", stats: StreamStats, concurrent: bool, full_recrawl: bool):
+    def on_inserted(ids: List[int]):
+        stats.add(inserted=len(ids))
+        # label 큐가 가득 차 있으면 여기서 대기 → 크롤링 속도가 라벨링 속도에 맞춰짐
+        label_q.put((list(ids), time.monotonic()))
+
+    try:
+        run_batch(concurrent=concurrent, full_recrawl=full_recrawl, on_inserted=on_inserted)
+    except Exception as e:
+        stats.error("crawl", e)
+        print(f"❌ 크롤링 단계 오류: {e}")
+    finally:
+        label_q.put(_DONE)
+
+
+def label_stage(label_q: "queue.Queue", keyword_q: "queue.Queue", stats: StreamStats):
+    done = False
+    try:
+        label_with_model.warm_up()
+        while not done:
+            items, done = _collect(label_q, LABEL_BATCH, LABEL_FLUSH_SEC)
+            if not items:
+                continue
+
+            ids = [i for batch, _ in items for i in batch]
+            first_seen = min(t for _, t in items)
+            try:
+                updated, failed = label_with_model.label_ids(ids)
+            except Exception as e:
+                # 이 묶음은 마지막 backlog 라벨링에서 다시 처리됨
+                print(f"[warn] 스트림 라벨링 실패 ({len(ids)}건): {e}")
+                continue
+
+            stats.add(labeled=updated, failed=failed)
+            print(f"🧠 스트림 라벨링: {len(ids)}건 중 {updated}건 반영")
+            keyword_q.put((ids, first_seen))
+    except Exception as e:
+        stats.error("label", e)
+        print(f"❌ 라벨링 단계 오류: {e}")
+        # 크롤링 스레드가 큐에서 막히지 않도록 남은 항목은 계속 비움
+        while not done:
+            done = label_q.get() is _DONE
+    finally:
+        keyword_q.put(_DONE)
+
+
+def keyword_stage(keyword_q: "queue.Queue", stats: StreamStats, top_k: int):
+    done = False
+    while not done:
+        items, done = _collect(keyword_q, sys.maxsize, KEYWORD_FLUSH_SEC)
+        if not items:
+            continue
+
+        first_seen = min(t for _, t in items)
+        try:
+            analyze_keywords_incremental(top_k=top_k)
+        except Exception as e:
+            # watermark 가 그대로라 다음 집계에서 다시 반영됨
+            print(f"[warn] 스트림 키워드 집계 실패: {e}")
+            continue
+
+        stats.add(keyword_runs=1)
+        stats.observe_latency(time.monotonic() - first_seen)
+
+
+def _thread(name: str, target, *args) -> threading.Thread:
+    t = threading.Thread(target=target, args=args, name=f"stream-{name}", daemon=True)
+    t.start()
+    return t
+
+
+# -----------------------------
+# 메인 로직
+# -----------------------------
+def run_streaming(
+    concurrent: bool = CRAWL_CONCURRENT,
+    full_recrawl: bool = False,
+    top_k: int = 30,
+    recent_months: int = label_with_model.RECENT_MONTHS,
+) -> StreamStats:
+    """
+    crawl / label / keyword 단계를 동시에 실행하고 처리 현황을 반환.
+    단계 스레드에서 오류가 있었으면 마무리 작업까지 끝낸 뒤 RuntimeError.
+    """
+    print("🌊 스트리밍 파이프라인 시작 (crawl → label → keyword)")
+
+    stats = StreamStats()
+    label_q: "queue.Queue" = queue.Queue(maxsize=LABEL_QUEUE_SIZE)
+    keyword_q: "queue.Queue" = queue.Queue(maxsize=KEYWORD_QUEUE_SIZE)
+
+    threads = [
+        _thread("crawl", crawl_stage, label_q, stats, concurrent, full_recrawl),
+        _thread("label", label_stage, label_q, keyword_q, stats),
+        _thread("keyword", keyword_stage, keyword_q, stats, top_k),
+    ]
+    for t in threads:
+        t.join()
+
+    # 스트림에 안 들어온 행 (이전 실행 backlog, 실패한 묶음) 마무리
+    print("\n🧹 남은 backlog 라벨링 + 마지막 키워드 집계")
+    updated, failed = label_with_model.main(recent_months=recent_months)
+    stats.add(labeled=updated, failed=failed)
+    analyze_keywords_incremental(top_k=top_k)
+
+    print(
+        f"🌊 스트리밍 완료: 삽입 {stats.inserted}건 / 라벨링 {stats.labeled}건 "
+        f"(실패 {stats.failed}건) / 키워드 집계 {stats.keyword_runs}회"
+    )
+    if stats.keyword_runs:
+        print(f"⏱️ INSERT → 키워드 통계 반영 최대 지연: {stats.max_latency_sec:.1f}s")
+
+    if stats.errors:
+        raise RuntimeError("; ".join(stats.errors))
+    return stats
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "--concurrent",
+        action="store_true",
+        default=CRAWL_CONCURRENT,
+        help="asyncio 동시 크롤링 엔진 사용 (youtube_async.py)",
+    )
+    ap.add_argument(
+        "--full-recrawl",
+        action="store_true",
+        help="crawl_state / search 캐시를 무시하고 처음부터 다시 수집",
+    )
+    ap.add_argument("--top-k", type=int, default=30, help="카메라/감성별로 저장할 키워드 수")
+    ap.add_argument(
+        "--recent-months",
+        type=int,
+        default=label_with_model.RECENT_MONTHS,
+        help="마지막 backlog 라벨링을 최근 N개월 수집 월 파티션으로 제한 (0: 전체)",
+    )
+    args = ap.parse_args()
+
+    run_streaming(
+        concurrent=args.concurrent,
+        full_recrawl=args.full_recrawl,
+        top_k=args.top_k,
+        recent_months=args.recent_months,
+    )
@@ -0,0 +1,14 @@
+"""
+datapipe/tests 공통 설정.
+
+datapipe 의 스크립트는 패키지가 아니라 `cd datapipe` 후 실행하는 평평한 모듈이라
+테스트에서도 datapipe 폴더를 import 경로에 넣는다.
+
+  cd datapipe
+  python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
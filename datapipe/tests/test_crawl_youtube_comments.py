@@ -0,0 +1,125 @@
+"""
+동기 크롤러(crawl_youtube_comments)가 비디오 도중 quota 소진 시
+이미 받은 페이지의 댓글을 저장하고 QuotaExhausted 로 끝나는지 확인.
+
+YouTube 클라이언트는 commentThreads().list(...).execute() 만 흉내 내는 가짜로,
+DB 쓰기는 메모리 기록으로 바꿔서 돌린다.
+"""
+
+import argparse
+
+import pytest
+
+import crawl_youtube_comments
+import youtube_quota
+from crawl_youtube_comments import InsertResult
+
+PAGES = {
+    None: {
+        "items": [
+            ("c4", "색감이 정말 자연스럽고 피부톤이 예쁘게 나와요", "2025-01-04T00:00:00Z"),
+            ("c3", "저조도에서 노이즈가 생각보다 적네요", "2025-01-03T00:00:00Z"),
+        ],
+        "nextPageToken": "p2",
+    },
+    "p2": {
+        "items": [
+            ("c2", "동영상 촬영할 때 발열이 좀 있는 편이에요", "2025-01-02T00:00:00Z"),
+        ],
+    },
+}
+
+
+class _Request:
+    def __init__(self, resp):
+        self.resp = resp
+
+    def execute(self):
+        return self.resp
+
+
+class _FakeYouTube:
+    """commentThreads().list(pageToken=...) → PAGES 응답"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def commentThreads(self):
+        return self
+
+    def list(self, pageToken=None, **_):
+        self.calls += 1
+        page = PAGES[pageToken]
+        items = [
+            {
+                "id": cid,
+                "snippet": {
+                    "topLevelComment": {
+                        "id": cid,
+                        "snippet": {"textDisplay": text, "publishedAt": published_at},
+                    }
+                },
+            }
+            for cid, text, published_at in page["items"]
+        ]
+        resp = {"items": items}
+        if page.get("nextPageToken"):
+            resp["nextPageToken"] = page["nextPageToken"]
+        return _Request(resp)
+
+
+@pytest.fixture
+def crawler(monkeypatch):
+    yt = _FakeYouTube()
+    db = {"rows": [], "states": {}, "flushed": 0}
+
+    def insert_reviews(rows, camera_model):
+        start = len(db["rows"])
+        db["rows"].extend(rows)
+        return InsertResult(inserted_ids=list(range(start + 1, len(db["rows"]) + 1)))
+
+    def save_state(engine, camera, video_id, state):
+        db["states"][video_id] = state
+
+    monkeypatch.setattr(crawl_youtube_comments, "get_youtube", lambda: yt)
+    monkeypatch.setattr(crawl_youtube_comments, "search_videos", lambda q, max_results: ["v1"])
+    monkeypatch.setattr(crawl_youtube_comments, "insert_reviews", insert_reviews)
+    monkeypatch.setattr(crawl_youtube_comments, "save_state", save_state)
+    monkeypatch.setattr(
+        crawl_youtube_comments, "filter_near_duplicates", lambda engine, rows: (rows, 0)
+    )
+    monkeypatch.setattr(crawl_youtube_comments.time, "sleep", lambda _: None)
+
+    previous = youtube_quota._budget
+    # commentThreads 1페이지만 받을 수 있는 quota
+    budget = youtube_quota.QuotaBudget(limit=1)
+    monkeypatch.setattr(budget, "flush", lambda engine: db.__setitem__("flushed", db["flushed"] + 1))
+    youtube_quota.set_budget(budget)
+    yield yt, db
+    youtube_quota.set_budget(previous)
+
+
+def test_quota_exhausted_mid_video_saves_fetched_pages(crawler):
+    yt, db = crawler
+    args = argparse.Namespace(
+        query="소니 A7M4 리뷰",
+        camera="Sony A7 IV",
+        max_videos=1,
+        comments_per_video=10,
+        full_recrawl=True,
+        progress=False,
+    )
+
+    with pytest.raises(youtube_quota.QuotaExhausted):
+        crawl_youtube_comments.main(args)
+
+    # 2번째 페이지는 보내기 전에 막힘
+    assert yt.calls == 1
+    # 1페이지 댓글은 저장, 끝까지 못 받았으므로 high-water mark 는 올리지 않음
+    assert [r["content"] for r in db["rows"]] == [
+        "색감이 정말 자연스럽고 피부톤이 예쁘게 나와요",
+        "저조도에서 노이즈가 생각보다 적네요",
+    ]
+    assert db["states"] == {}
+    # 예외로 끝나도 사용량 기록
+    assert db["flushed"] == 1
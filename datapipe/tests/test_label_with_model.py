@@ -0,0 +1,22 @@
+"""
+label_with_model 의 빈 리뷰 판단이 SQL / Python 에서 같은지 확인.
+"""
+
+import sys
+
+import label_with_model
+
+
+def test_blank_chars_match_str_isspace():
+    expected = "".join(ch for ch in map(chr, range(sys.maxunicode + 1)) if ch.isspace())
+    assert label_with_model.BLANK_CHARS == expected
+
+
+def test_blank_content_is_dead_lettered():
+    rows = [{"id": 1, "content": "\n"}, {"id": 2, "content": "　 "}, {"id": 3, "content": None}]
+
+    params, failures = label_with_model.classify_rows(rows)
+
+    assert params == []
+    assert [f["review_id"] for f in failures] == [1, 2, 3]
+    assert {f["error"] for f in failures} == {"empty content"}
@@ -0,0 +1,254 @@
+"""
+youtube_async 동시 크롤링 엔진을 youtube_stub_server 로 돌려보는 테스트.
+
+  - stub 서버가 요청마다 429 / 503 을 먼저 돌려줘도 재시도 후 전부 수집되는지
+  - 크롤링 도중 quota 가 소진돼도 이미 받은 댓글은 저장되고 QuotaExhausted 로 끝나는지
+  - 동시에 크롤링하는 비디오끼리 near-dup 필터 + INSERT 가 겹치지 않는지
+
+DB 는 쓰지 않음: 검색 캐시 / crawl_state 를 건너뛰는 full_recrawl 로 돌리고
+INSERT / 상태 저장 / near-dup 필터는 메모리에 기록하는 함수로 바꿔서 확인한다.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import youtube_async
+import youtube_quota
+from batch_crawl_cameras import CameraJob
+from crawl_youtube_comments import InsertResult
+from youtube_async import AsyncYouTubeClient, TokenBucket, crawl_camera, response_key
+from youtube_stub_server import make_handler
+
+QUERY = "소니 A7M4 리뷰"
+COMMENTS_PER_VIDEO = 10
+
+
+def _comment(cid: str, text: str, published_at: str) -> dict:
+    return {
+        "id": cid,
+        "snippet": {
+            "topLevelComment": {
+                "id": cid,
+                "snippet": {"textDisplay": text, "publishedAt": published_at},
+            }
+        },
+    }
+
+
+def _write(fixtures, endpoint: str, params: dict, payload: dict):
+    path = fixtures / f"{endpoint}-{response_key(endpoint, params)}.json"
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+
+def _comment_params(video_id: str, page_token, max_results: int) -> dict:
+    """youtube_async.AsyncYouTubeClient.fetch_comments 가 보내는 파라미터와 같게"""
+    return {
+        "part": "snippet",
+        "videoId": video_id,
+        "pageToken": page_token,
+        "maxResults": max_results,
+        "order": "time",
+        "textFormat": "plainText",
+    }
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    """
+    검색 결과 비디오 2개, 페이지마다 댓글 2개
+      - v1 : 2페이지 (댓글 4개)
+      - v2 : 1페이지 (댓글 2개)
+    """
+    _write(
+        tmp_path,
+        "search",
+        {
+            "q": QUERY,
+            "part": "id",
+            "type": "video",
+            "maxResults": 2,
+            "relevanceLanguage": "ko",
+        },
+        {"items": [{"id": {"videoId": "v1"}}, {"id": {"videoId": "v2"}}]},
+    )
+    _write(
+        tmp_path,
+        "commentThreads",
+        _comment_params("v1", None, COMMENTS_PER_VIDEO),
+        {
+            "items": [
+                _comment("v1-c4", "색감이 정말 자연스럽고 피부톤이 예쁘게 나와요", "2025-01-04T00:00:00Z"),
+                _comment("v1-c3", "저조도에서 노이즈가 생각보다 적네요", "2025-01-03T00:00:00Z"),
+            ],
+            "nextPageToken": "v1-p2",
+        },
+    )
+    _write(
+        tmp_path,
+        "commentThreads",
+        _comment_params("v1", "v1-p2", COMMENTS_PER_VIDEO - 2),
+        {
+            "items": [
+                _comment("v1-c2", "동영상 촬영할 때 발열이 좀 있는 편이에요", "2025-01-02T00:00:00Z"),
+                _comment("v1-c1", "오토포커스 트래킹이 빠르고 정확합니다", "2025-01-01T00:00:00Z"),
+            ],
+        },
+    )
+    _write(
+        tmp_path,
+        "commentThreads",
+        _comment_params("v2", None, COMMENTS_PER_VIDEO),
+        {
+            "items": [
+                _comment("v2-c2", "손떨림 보정이 있어서 동영상이 안정적이네요", "2025-02-02T00:00:00Z"),
+                _comment("v2-c1", "렌즈 교환이 편하고 바디가 가벼워요", "2025-02-01T00:00:00Z"),
+            ],
+        },
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def stub_server(fixtures):
+    """youtube_stub_server 를 스레드로 띄우고 (base_url, handler 클래스) 를 넘김"""
+    servers = []
+
+    def start(fail_first: int = 0):
+        handler = make_handler(fixtures, fail_rate=0.0, fail_first=fail_first)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/youtube/v3", handler
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """INSERT / crawl_state 저장 / near-dup 필터를 메모리 기록으로 대체"""
+    db = {"rows": [], "states": {}}
+
+    def insert_reviews(rows, camera_model):
+        start = len(db["rows"])
+        db["rows"].extend(dict(r, camera_model=camera_model) for r in rows)
+        return InsertResult(inserted_ids=list(range(start + 1, len(db["rows"]) + 1)))
+
+    def save_state(engine, camera, video_id, state):
+        db["states"][video_id] = state
+
+    monkeypatch.setattr(youtube_async, "insert_reviews", insert_reviews)
+    monkeypatch.setattr(youtube_async, "save_state", save_state)
+    monkeypatch.setattr(youtube_async, "filter_near_duplicates", lambda engine, rows: (rows, 0))
+    # 재시도 대기 없이
+    monkeypatch.setattr(youtube_async, "BACKOFF_BASE", 0.0)
+    return db
+
+
+@pytest.fixture
+def budget():
+    """테스트마다 새 QuotaBudget (limit 0 = 제한 없음), 끝나면 원래대로"""
+    previous = youtube_quota._budget
+
+    def make(limit: int = 0):
+        b = youtube_quota.QuotaBudget(limit=limit)
+        youtube_quota.set_budget(b)
+        return b
+
+    yield make
+    youtube_quota.set_budget(previous)
+
+
+def _job():
+    return CameraJob(
+        camera="Sony A7 IV",
+        query=QUERY,
+        max_videos=2,
+        comments_per_video=COMMENTS_PER_VIDEO,
+    )
+
+
+def _client(base_url: str) -> AsyncYouTubeClient:
+    return AsyncYouTubeClient(
+        api_key="dummy",
+        base_url=base_url,
+        limiter=TokenBucket(rate=1000, capacity=1000),
+    )
+
+
+def test_retries_429_503_then_collects_everything(stub_server, fake_db, budget):
+    base_url, handler = stub_server(fail_first=2)
+    used = budget()
+
+    client = _client(base_url)
+    result = asyncio.run(crawl_camera(client, _job(), full_recrawl=True))
+
+    # search 1 + commentThreads 3 = 서로 다른 요청 4개, 각각 429 → 503 → 200
+    assert handler.served == {429: 4, 503: 4, 200: 4}
+    assert client.requests == 12
+    assert client.retries == 8
+    # 재시도한 요청도 quota 를 씀
+    assert used.used == 3 * (100 + 3)
+
+    assert result.inserted == 6
+    assert {r["source"] for r in fake_db["rows"]} == {"youtube:v1", "youtube:v2"}
+    assert fake_db["states"]["v1"].last_comment_id == "v1-c4"
+    assert fake_db["states"]["v2"].last_comment_id == "v2-c2"
+
+
+def test_quota_exhausted_keeps_fetched_comments(stub_server, fake_db, budget):
+    base_url, _ = stub_server()
+    # search 1번 + commentThreads 2페이지까지만
+    budget(limit=100 + 2)
+
+    client = _client(base_url)
+    with pytest.raises(youtube_quota.QuotaExhausted):
+        asyncio.run(crawl_camera(client, _job(), full_recrawl=True))
+
+    # 3번째 commentThreads 는 보내기 전에 막힘
+    assert client.requests == 3
+    # 받은 2페이지의 댓글은 (어느 비디오든) 모두 저장
+    assert len(fake_db["rows"]) == 4
+    # 끝까지 못 받은 비디오의 high-water mark 는 올리지 않음
+    sources = [r["source"] for r in fake_db["rows"]]
+    if sources.count("youtube:v1") == 4:
+        assert set(fake_db["states"]) == {"v1"}
+    else:
+        assert set(fake_db["states"]) == {"v2"}
+
+
+def test_near_dup_filter_and_insert_run_one_video_at_a_time(stub_server, fake_db, budget, monkeypatch):
+    base_url, _ = stub_server()
+    budget()
+    active = {"now": 0, "max": 0}
+    guard = threading.Lock()
+
+    def filter_near_duplicates(engine, rows):
+        # 필터 → INSERT 사이에 다른 비디오가 끼어들면 서로의 signature 를 못 봄
+        with guard:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.05)
+        return rows, 0
+
+    def insert_reviews(rows, camera_model, _insert=youtube_async.insert_reviews):
+        result = _insert(rows, camera_model)
+        with guard:
+            active["now"] -= 1
+        return result
+
+    monkeypatch.setattr(youtube_async, "filter_near_duplicates", filter_near_duplicates)
+    monkeypatch.setattr(youtube_async, "insert_reviews", insert_reviews)
+
+    result = asyncio.run(crawl_camera(_client(base_url), _job(), full_recrawl=True))
+
+    assert result.inserted == 6
+    assert active["max"] == 1
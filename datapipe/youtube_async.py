@@ -0,0 +1,504 @@
+"""
+datapipe/youtube_async.py
+
+asyncio 기반 동시 크롤링 엔진.
+
+  - 여러 카메라 / 여러 비디오의 댓글 페이지를 동시에 요청
+  - 모든 요청은 하나의 token-bucket rate limiter 를 공유 (API quota 보호)
+  - 403(rate limit) / 429 / 5xx / 네트워크 오류는 지수 backoff 로 재시도
+    (commentsDisabled, quotaExceeded 처럼 재시도해도 소용없는 오류는 바로 포기)
+
+HTTP 는 표준 라이브러리(urllib)를 스레드에서 호출하므로 추가 의존성이 없고,
+YOUTUBE_API_BASE 를 바꾸면 로컬 stub 서버(youtube_stub_server.py)로 돌릴 수 있다.
+
+  # 실제 API 응답을 녹화
+  python batch_crawl_cameras.py --concurrent --record-dir ./yt_fixtures
+
+  # 녹화된 응답을 stub 서버로 재생하면서 크롤링
+  python youtube_stub_server.py --fixtures ./yt_fixtures --port 8765 &
+  YOUTUBE_API_BASE=http://localhost:8765/youtube/v3 YOUTUBE_API_KEY=dummy \
+      python batch_crawl_cameras.py --concurrent
+
+환경변수:
+  - YOUTUBE_API_BASE      : API base URL (기본 https://www.googleapis.com/youtube/v3)
+  - YOUTUBE_QPS           : 초당 허용 요청 수 (기본 5)
+  - YOUTUBE_BURST         : 순간 허용 요청 수 (기본 10)
+  - YOUTUBE_CONCURRENCY   : 동시에 진행 중인 HTTP 요청 수 상한 (기본 8)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from crawl_state import (
+    CommentPager,
+    VideoCrawlState,
+    load_cached_search,
+    load_states,
+    save_search,
+    save_state,
+)
+from crawl_youtube_comments import (
+    YOUTUBE_API_KEY,
+    InsertResult,
+    build_review_rows,
+    insert_reviews,
+    parse_comment_item,
+)
+from db import get_engine
+from metrics import incr
+from near_dup import filter_rows as filter_near_duplicates
+from noise_filter import format_rejections
+from youtube_quota import QuotaExhausted, QuotaExhaustedMidVideo, charge as charge_quota, get_budget
+
+
+YOUTUBE_API_BASE = os.environ.get(
+    "YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3"
+)
+YOUTUBE_QPS = float(os.environ.get("YOUTUBE_QPS", "5"))
+YOUTUBE_BURST = int(os.environ.get("YOUTUBE_BURST", "10"))
+YOUTUBE_CONCURRENCY = int(os.environ.get("YOUTUBE_CONCURRENCY", "8"))
+
+# 재시도 설정
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0   # 초
+BACKOFF_MAX = 60.0   # 초
+HTTP_TIMEOUT = 30    # 초
+
+# 403 중에서 잠시 후 재시도하면 풀리는 사유
+RETRYABLE_403_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+
+class YouTubeApiError(Exception):
+    """재시도 후에도 실패했거나 재시도할 수 없는 API 오류"""
+
+    def __init__(self, status: int, reason: str, message: str = ""):
+        super().__init__(f"HTTP {status} {reason}: {message}")
+        self.status = status
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    asyncio 용 token-bucket rate limiter.
+    rate: 초당 충전되는 토큰 수, capacity: 최대 보유 토큰 수(burst)
+    """
+
+    def __init__(self, rate: float = YOUTUBE_QPS, capacity: int = YOUTUBE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def response_key(endpoint: str, params: Dict) -> str:
+    """녹화/재생용 응답 키 (API 키는 제외하고 파라미터 정렬 후 해시)"""
+    items = sorted((k, str(v)) for k, v in params.items() if k != "key" and v is not None)
+    raw = endpoint + "?" + urllib.parse.urlencode(items)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _error_reason(body: str) -> str:
+    """YouTube 오류 응답 JSON 에서 reason 추출 (없으면 빈 문자열)"""
+    try:
+        errors = json.loads(body).get("error", {}).get("errors", [])
+        return errors[0].get("reason", "") if errors else ""
+    except (ValueError, AttributeError):
+        return ""
+
+
+def _is_retryable(status: int, reason: str) -> bool:
+    if status == 0 or status == 429 or status >= 500:
+        return True
+    return status == 403 and reason in RETRYABLE_403_REASONS
+
+
+class AsyncYouTubeClient:
+    """YouTube Data API v3 의 search / commentThreads 를 asyncio 로 호출"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = YOUTUBE_API_KEY,
+        base_url: str = YOUTUBE_API_BASE,
+        limiter: Optional[TokenBucket] = None,
+        concurrency: int = YOUTUBE_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        record_dir: Optional[str] = None,
+    ):
+        if not api_key:
+            raise RuntimeError("YOUTUBE_API_KEY 환경변수를 먼저 설정하세요.")
+
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.record_dir = Path(record_dir) if record_dir else None
+        self._sem = asyncio.Semaphore(concurrency)
+
+        # 호출 통계
+        self.requests = 0
+        self.retries = 0
+
+    def _http_get(self, url: str):
+        """(status, body) 반환. 네트워크 오류는 status 0"""
+        try:
+            with urllib.request.urlopen(url, timeout=HTTP_TIMEOUT) as resp:
+                return resp.status, resp.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8", errors="replace")
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            return 0, str(e)
+
+    async def get(self, endpoint: str, params: Dict) -> Dict:
+        """rate limit + 재시도를 적용한 GET 요청"""
+        query = {k: v for k, v in params.items() if v is not None}
+        query["key"] = self.api_key
+        url = f"{self.base_url}/{endpoint}?{urllib.parse.urlencode(query)}"
+
+        for attempt in range(self.max_retries + 1):
+            # 재시도한 요청도 quota 를 씀 → 매 시도마다 차감 (소진 시 QuotaExhausted)
+            charge_quota(endpoint)
+            await self.limiter.acquire()
+            async with self._sem:
+                self.requests += 1
+                incr("youtube_api_calls")
+                status, body = await asyncio.to_thread(self._http_get, url)
+
+            if status == 200:
+                data = json.loads(body)
+                if self.record_dir:
+                    self._record(endpoint, params, data)
+                return data
+
+            reason = _error_reason(body)
+            if not _is_retryable(status, reason) or attempt == self.max_retries:
+                raise YouTubeApiError(status, reason, body[:200])
+
+            # 지수 backoff + jitter
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random())
+            self.retries += 1
+            incr("youtube_api_retries")
+            print(f"[retry] {endpoint} HTTP {status} {reason} → {delay:.1f}s 후 재시도")
+            await asyncio.sleep(delay)
+
+    def _record(self, endpoint: str, params: Dict, data: Dict):
+        self.record_dir.mkdir(parents=True, exist_ok=True)
+        path = self.record_dir / f"{endpoint}-{response_key(endpoint, params)}.json"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    async def search_videos(self, query: str, max_results: int = 20) -> List[str]:
+        """검색어로 유튜브 비디오 검색 후 videoId 리스트 반환"""
+        video_ids: List[str] = []
+        next_page_token = None
+
+        while len(video_ids) < max_results:
+            resp = await self.get(
+                "search",
+                {
+                    "q": query,
+                    "part": "id",
+                    "type": "video",
+                    "maxResults": min(50, max_results - len(video_ids)),
+                    "pageToken": next_page_token,
+                    "relevanceLanguage": "ko",
+                },
+            )
+
+            for item in resp.get("items", []):
+                video_ids.append(item["id"]["videoId"])
+
+            next_page_token = resp.get("nextPageToken")
+            if not next_page_token:
+                break
+
+        return video_ids
+
+    async def fetch_comments(
+        self, video_id: str, max_comments: int = 200, state: Optional[VideoCrawlState] = None
+    ) -> Tuple[List[Dict], Optional[VideoCrawlState]]:
+        """
+        비디오 1개의 top-level 댓글을 최신순으로 수집 (crawl_state.CommentPager 사용)
+        반환: (댓글 리스트, 다음 실행을 위한 VideoCrawlState)
+              새 댓글 수집 중 실패했으면 상태는 None (저장된 상태 유지)
+        quota 가 소진되면 QuotaExhaustedMidVideo (이미 받은 댓글은 버리지 않도록 같이 넘김)
+        """
+        pager = CommentPager(video_id, max_comments, state, parse_comment_item)
+
+        while pager.has_next():
+            try:
+                resp = await self.get(
+                    "commentThreads",
+                    {
+                        "part": "snippet",
+                        "videoId": video_id,
+                        "pageToken": pager.page_token,
+                        "maxResults": pager.page_size(),
+                        "order": "time",
+                        "textFormat": "plainText",
+                    },
+                )
+            except YouTubeApiError as e:
+                # 댓글 비활성화 영상 등은 여기서 정리하고 다음 영상으로
+                print(f"[warn] commentThreads 에러(video={video_id}): {e}")
+                pager.fail()
+                break
+            except QuotaExhausted as e:
+                pager.fail()
+                raise QuotaExhaustedMidVideo(e, pager.comments, pager.result_state()) from e
+
+            pager.feed(resp)
+
+        return pager.comments, pager.result_state()
+
+
+# -----------------------------
+# 크롤링 orchestration
+# -----------------------------
+async def search_videos_cached(client: AsyncYouTubeClient, query: str, max_results: int):
+    """search_cache 테이블에 TTL 안의 결과가 있으면 재사용"""
+    engine = get_engine()
+    video_ids = await asyncio.to_thread(load_cached_search, engine, query, max_results)
+    if video_ids is not None:
+        return video_ids
+
+    video_ids = await client.search_videos(query, max_results=max_results)
+    await asyncio.to_thread(save_search, engine, query, max_results, video_ids)
+    return video_ids
+
+
+async def crawl_camera(
+    client: AsyncYouTubeClient,
+    job,
+    full_recrawl: bool = False,
+    on_inserted: Optional[Callable[[List[int]], None]] = None,
+    insert_lock: Optional[asyncio.Lock] = None,
+) -> InsertResult:
+    """
+    CameraJob 1개 처리: 검색 → 비디오별 댓글 동시 수집 → 노이즈 필터 → INSERT
+    - crawl_state 의 high-water mark 를 이용해 새 댓글(delta)만 수집
+    - on_inserted 가 있으면 비디오마다 새로 삽입된 review.id 를 넘김 (stream_pipeline.py)
+    - near-dup 필터 + INSERT 는 insert_lock 으로 한 번에 비디오 1개씩
+      (필터는 DB 에 저장된 signature 만 후보로 보므로, 동시에 돌면 여러 비디오에
+       복사된 같은 댓글이 서로를 못 보고 전부 들어감. 댓글 수집은 계속 동시에 진행)
+      여러 job 이 같은 loop 를 쓰면 같은 lock 을 넘겨서 카메라 사이에서도 직렬화
+    반환: 카메라 전체의 InsertResult (삽입된 id + 중복/제외 수)
+
+    비디오 하나가 실패해도 나머지 비디오는 끝까지 처리하고 저장한 뒤,
+    quota 소진이면 QuotaExhausted, 그 밖의 오류면 첫 오류를 다시 올림 (JobScheduler 가 defer / 재시도)
+    """
+    engine = get_engine()
+    insert_lock = insert_lock or asyncio.Lock()
+
+    if full_recrawl:
+        video_ids = await client.search_videos(job.query, max_results=job.max_videos)
+        states = {}
+    else:
+        video_ids = await search_videos_cached(client, job.query, job.max_videos)
+        states = await asyncio.to_thread(load_states, engine, job.camera, video_ids)
+    print(f"🔍 {job.camera}: 검색된 비디오 {len(video_ids)}개")
+
+    rejected = Counter()
+
+    async def crawl_video(vid: str) -> InsertResult:
+        quota_error = None
+        try:
+            comments, new_state = await client.fetch_comments(
+                vid, max_comments=job.comments_per_video, state=states.get(vid)
+            )
+        except QuotaExhaustedMidVideo as e:
+            # 이미 받은 댓글은 저장하고 나서 quota 소진을 알림
+            comments, new_state, quota_error = e.comments, e.state, e
+        incr("rows_in", len(comments))
+        rows = build_review_rows(comments, vid, rejected)
+        # DB 작업은 블로킹이라 스레드에서 실행
+        async with insert_lock:
+            rows, near_dups = await asyncio.to_thread(filter_near_duplicates, engine, rows)
+            result = await asyncio.to_thread(insert_reviews, rows, job.camera)
+        rejected["near_duplicate"] += near_dups
+        if not result.failed and new_state is not None:
+            await asyncio.to_thread(save_state, engine, job.camera, vid, new_state)
+        if on_inserted is not None and result.inserted_ids:
+            # 큐가 가득 차면 이 비디오만 기다림 (event loop 는 막지 않음)
+            await asyncio.to_thread(on_inserted, result.inserted_ids)
+        if quota_error is not None:
+            raise quota_error
+        return result
+
+    # 한 비디오의 예외가 gather 를 먼저 끝내면 나머지 비디오는 결과를 버린 채 계속 돌게 됨
+    # → 전부 끝날 때까지 기다린 뒤 결과별로 처리
+    results = await asyncio.gather(
+        *(crawl_video(vid) for vid in video_ids), return_exceptions=True
+    )
+
+    total = InsertResult()
+    quota_error = None
+    errors = []
+    for vid, result in zip(video_ids, results):
+        if isinstance(result, QuotaExhausted):
+            quota_error = quota_error or result
+            errors.append(result)
+        elif isinstance(result, Exception):
+            print(f"[warn] {job.camera} 비디오 {vid} 처리 실패: {type(result).__name__}: {result}")
+            errors.append(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            total.inserted_ids.extend(result.inserted_ids)
+            total.skipped += result.skipped
+    print(f"🧹 {job.camera}: 노이즈 댓글 제외 {format_rejections(rejected)}")
+
+    if errors:
+        print(
+            f"⚠️ {job.camera}: 비디오 {len(video_ids)}개 중 {len(errors)}개 실패 "
+            f"(나머지 비디오 삽입 {total.inserted}건은 저장됨)"
+        )
+        raise quota_error or errors[0]
+    return total
+
+
+async def crawl_jobs_async(
+    jobs,
+    record_dir: Optional[str] = None,
+    full_recrawl: bool = False,
+    on_inserted: Optional[Callable[[List[int]], None]] = None,
+) -> Dict[str, int]:
+    """
+    여러 CameraJob 을 동시에 처리.
+    반환: { camera: 삽입 수 } (실패한 카메라는 -1)
+    """
+    client = AsyncYouTubeClient(record_dir=record_dir)
+    insert_lock = asyncio.Lock()
+
+    async def run_one(job):
+        try:
+            result = await crawl_camera(
+                client,
+                job,
+                full_recrawl=full_recrawl,
+                on_inserted=on_inserted,
+                insert_lock=insert_lock,
+            )
+        except QuotaExhausted as e:
+            print(f"⏸️  {job.camera} quota 소진으로 중단: {e}")
+            return job.camera, -1
+        except Exception as e:
+            print(f"❌ {job.camera} 크롤링 중 오류 발생:", e)
+            return job.camera, -1
+        print(
+            f"✅ {job.camera} 크롤링 완료 "
+            f"(삽입 {result.inserted}건, 중복/제외 {result.skipped}건)"
+        )
+        return job.camera, result.inserted
+
+    try:
+        results = await asyncio.gather(
+            *(run_one(job) for job in jobs), return_exceptions=True
+        )
+    finally:
+        await asyncio.to_thread(get_budget().flush, get_engine())
+        print(f"📡 API 요청 {client.requests}회 (재시도 {client.retries}회)")
+
+    counts = {}
+    for result in results:
+        if isinstance(result, BaseException):
+            # run_one 이 잡지 못한 취소 / KeyboardInterrupt 등
+            raise result
+        camera, inserted = result
+        counts[camera] = inserted
+    return counts
+
+
+class AsyncJobRunner:
+    """
+    JobScheduler 의 run_job 으로 쓰는 어댑터 (batch_crawl_cameras --concurrent).
+
+    event loop 1개를 백그라운드 스레드에서 돌리고, scheduler worker 스레드가 job 마다
+    crawl_camera 를 그 loop 에 넘긴 뒤 결과를 기다림
+      → 모든 job 이 같은 client (token bucket / 동시 요청 상한) 와 near-dup INSERT lock 을 공유
+      → priority / crawl_job_status 기록 / 재시도 / 이어받기는 JobScheduler 가 그대로 처리
+
+      with AsyncJobRunner(full_recrawl=False) as run_job:
+          JobScheduler(run_job, ...).run(jobs)
+    """
+
+    def __init__(
+        self,
+        record_dir: Optional[str] = None,
+        full_recrawl: bool = False,
+        on_inserted: Optional[Callable[[List[int]], None]] = None,
+    ):
+        self.client = AsyncYouTubeClient(record_dir=record_dir)
+        self.full_recrawl = full_recrawl
+        self.on_inserted = on_inserted
+        self.insert_lock = asyncio.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="crawl-async-loop", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, job) -> int:
+        """CameraJob 1개 크롤링 → 삽입 수 (오류는 그대로 전파 → 스케줄러가 재시도 / defer)"""
+        future = asyncio.run_coroutine_threadsafe(
+            crawl_camera(
+                self.client,
+                job,
+                full_recrawl=self.full_recrawl,
+                on_inserted=self.on_inserted,
+                insert_lock=self.insert_lock,
+            ),
+            self._loop,
+        )
+        return future.result().inserted
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        print(f"📡 API 요청 {self.client.requests}회 (재시도 {self.client.retries}회)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def crawl_jobs(
+    jobs,
+    record_dir: Optional[str] = None,
+    full_recrawl: bool = False,
+    on_inserted: Optional[Callable[[List[int]], None]] = None,
+) -> Dict[str, int]:
+    """동기 코드에서 호출하는 진입점"""
+    return asyncio.run(
+        crawl_jobs_async(
+            jobs, record_dir=record_dir, full_recrawl=full_recrawl, on_inserted=on_inserted
+        )
+    )
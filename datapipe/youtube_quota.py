@@ -0,0 +1,129 @@
+"""
+datapipe/youtube_quota.py
+
+YouTube Data API quota 사용량 집계 (동기 / 비동기 크롤러, 크롤링 job 들이 공유).
+
+  - 요청 종류별 비용: search 100, commentThreads 1 (YouTube 기본 quota 표)
+  - 하루 한도(YOUTUBE_DAILY_QUOTA, 기본 10000)를 넘는 요청은 보내기 전에 QuotaExhausted
+  - 사용량은 youtube_quota_usage 테이블에 날짜별로 누적
+    (quota 는 태평양 시간 자정에 초기화되므로 그 기준 날짜 사용)
+    → 같은 날 다시 실행해도 이미 쓴 양을 알고 시작
+
+  charge("search")            # 요청 직전에 호출
+  get_budget().remaining      # 남은 quota
+"""
+
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+
+from metrics import incr
+
+# 하루 quota 한도 (0 이면 제한 없음, 집계만)
+YOUTUBE_DAILY_QUOTA = int(os.environ.get("YOUTUBE_DAILY_QUOTA", "10000"))
+
+QUOTA_COST = {
+    "search": 100,
+    "commentThreads": 1,
+}
+
+LOAD_USAGE_SQL = text("""
+  SELECT units
+    FROM youtube_quota_usage
+   WHERE day = (now() AT TIME ZONE 'America/Los_Angeles')::date
+""")
+
+ADD_USAGE_SQL = text("""
+  INSERT INTO youtube_quota_usage (day, units, updated_at)
+  VALUES ((now() AT TIME ZONE 'America/Los_Angeles')::date, :units, now())
+  ON CONFLICT (day) DO UPDATE
+     SET units      = youtube_quota_usage.units + EXCLUDED.units,
+         updated_at = now()
+""")
+
+
+class QuotaExhausted(RuntimeError):
+    """하루 quota 를 다 써서 더 이상 요청하지 않음 (재시도 대상 아님)"""
+
+
+class QuotaExhaustedMidVideo(QuotaExhausted):
+    """
+    비디오 댓글을 받는 도중 quota 소진 (동기 / 비동기 크롤러 공통).
+    그때까지 받은 댓글과 다음 실행용 상태(CommentPager.result_state())를 같이 넘겨서
+    호출한 쪽이 저장한 뒤 다시 올리도록 함 → 이미 quota 를 쓴 페이지를 버리지 않음
+    """
+
+    def __init__(self, cause: QuotaExhausted, comments, state):
+        super().__init__(str(cause))
+        self.comments = comments
+        self.state = state
+
+
+class QuotaBudget:
+    """스레드 / 코루틴이 같이 쓰는 quota 계산기"""
+
+    def __init__(self, limit: int = YOUTUBE_DAILY_QUOTA, used: int = 0):
+        self.limit = limit
+        self.used = used
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, engine, limit: int = YOUTUBE_DAILY_QUOTA) -> "QuotaBudget":
+        """오늘 이미 사용한 양을 DB 에서 읽어서 시작"""
+        with engine.connect() as conn:
+            used = conn.execute(LOAD_USAGE_SQL).scalar()
+        return cls(limit=limit, used=int(used or 0))
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if not self.limit:
+            return None
+        return max(0, self.limit - self.used)
+
+    def charge(self, endpoint: str):
+        cost = QUOTA_COST.get(endpoint, 1)
+        with self._lock:
+            if self.limit and self.used + cost > self.limit:
+                raise QuotaExhausted(
+                    f"YouTube quota 소진 (사용 {self.used}/{self.limit}, {endpoint} 비용 {cost})"
+                )
+            self.used += cost
+            self._unsaved += cost
+        incr("youtube_quota_units", cost)
+
+    def flush(self, engine):
+        """아직 DB 에 반영하지 않은 사용량 누적"""
+        with self._lock:
+            units, self._unsaved = self._unsaved, 0
+        if not units:
+            return
+        try:
+            with engine.begin() as conn:
+                conn.execute(ADD_USAGE_SQL, {"units": units})
+        except Exception:
+            with self._lock:
+                self._unsaved += units
+            raise
+
+
+_budget: Optional[QuotaBudget] = None
+
+
+def get_budget() -> QuotaBudget:
+    """프로세스 전체에서 공유하는 QuotaBudget (없으면 사용량 0 으로 생성)"""
+    global _budget
+    if _budget is None:
+        _budget = QuotaBudget()
+    return _budget
+
+
+def set_budget(budget: QuotaBudget):
+    global _budget
+    _budget = budget
+
+
+def charge(endpoint: str):
+    get_budget().charge(endpoint)
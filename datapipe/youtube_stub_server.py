@@ -0,0 +1,103 @@
+"""
+datapipe/youtube_stub_server.py
+
+youtube_async.py 로 녹화한 API 응답을 그대로 돌려주는 로컬 stub 서버.
+실제 API quota 를 쓰지 않고 동시 크롤링 / 재시도 로직을 확인할 때 사용.
+
+실행 방법:
+
+  cd datapipe
+  python youtube_stub_server.py --fixtures ./yt_fixtures --port 8765
+
+  # 일부 요청을 429/503 으로 실패시켜 재시도 동작 확인
+  python youtube_stub_server.py --fixtures ./yt_fixtures --fail-rate 0.2
+
+  # 같은 요청마다 처음 2번은 429 → 503 으로 실패 (재시도 횟수가 정해져 있어 테스트용)
+  python youtube_stub_server.py --fixtures ./yt_fixtures --fail-first 2
+
+  # 크롤러는 base URL 만 바꿔서 실행
+  YOUTUBE_API_BASE=http://localhost:8765/youtube/v3 YOUTUBE_API_KEY=dummy \
+      python batch_crawl_cameras.py --concurrent
+
+응답 파일 이름 규칙: <endpoint>-<response_key>.json (youtube_async.response_key 참고)
+녹화된 응답이 없는 요청은 빈 items 로 응답한다.
+"""
+
+import argparse
+import json
+import random
+import threading
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from youtube_async import response_key
+
+
+def make_handler(fixtures: Path, fail_rate: float, fail_first: int = 0):
+    # 요청 키별로 몇 번 받았는지 (--fail-first)
+    seen = Counter()
+    seen_lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        # 테스트에서 응답 수를 확인할 수 있도록 (status -> 횟수)
+        served = Counter()
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            with seen_lock:
+                self.served[status] += 1
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+            params = dict(urllib.parse.parse_qsl(url.query))
+            key = response_key(endpoint, params)
+
+            status = None
+            if fail_first:
+                with seen_lock:
+                    seen[key] += 1
+                    n = seen[key]
+                if n <= fail_first:
+                    status = 429 if n % 2 else 503
+            if status is None and fail_rate and random.random() < fail_rate:
+                status = random.choice([429, 503])
+            if status is not None:
+                self._send(status, {"error": {"code": status, "errors": [{"reason": "stub"}]}})
+                return
+
+            path = fixtures / f"{endpoint}-{key}.json"
+            if path.exists():
+                self._send(200, json.loads(path.read_text(encoding="utf-8")))
+            else:
+                self._send(200, {"items": []})
+
+        def log_message(self, fmt, *args):
+            print(f"[stub] {self.address_string()} {fmt % args}")
+
+    return StubHandler
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", required=True, help="녹화된 응답 JSON 폴더")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="429/503 으로 실패시킬 비율 (0~1)")
+    ap.add_argument("--fail-first", type=int, default=0, help="같은 요청마다 처음 N번은 429/503 으로 실패")
+    args = ap.parse_args()
+
+    handler = make_handler(Path(args.fixtures), args.fail_rate, args.fail_first)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"🧪 YouTube stub 서버: http://127.0.0.1:{args.port}/youtube/v3 (fixtures={args.fixtures})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
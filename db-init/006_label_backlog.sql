@@ -0,0 +1,20 @@
+-- db-init/006_label_backlog.sql
+-- 목적: 감성 라벨링 backlog 스캔 최적화
+--   1) 아직 라벨이 없는 행만 담는 partial index (keyset pagination 용)
+--   2) 예측에 실패한 행을 기록하는 dead-letter 테이블
+
+-- 1) 라벨 미부여 행 partial index
+--    label_with_model.SELECT_SQL 의 조건과 동일한 predicate 를 사용해야 함
+CREATE INDEX IF NOT EXISTS idx_review_unlabeled
+    ON review (id)
+ WHERE sentiment_model IS NULL OR sentiment_model = '';
+
+-- 2) 예측 실패 행 (같은 모델로는 다시 가져오지 않음)
+CREATE TABLE IF NOT EXISTS review_label_failures (
+    review_id   INTEGER   NOT NULL,
+    model       TEXT      NOT NULL,
+    error       TEXT,
+    attempts    INTEGER   NOT NULL DEFAULT 1,
+    failed_at   TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (review_id, model)
+);
@@ -0,0 +1,12 @@
+-- db-init/007_sentiment_cache.sql
+-- 목적: 같은 문장에 대한 감성 예측 결과를 재사용하기 위한 캐시 테이블
+--   키: (모델명, 정규화된 문장의 sha256)
+
+CREATE TABLE IF NOT EXISTS sentiment_cache (
+    model            TEXT         NOT NULL,
+    text_hash        CHAR(64)     NOT NULL,
+    sentiment_label  VARCHAR(16)  NOT NULL,
+    sentiment_score  NUMERIC(4,3) NOT NULL,
+    created_at       TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (model, text_hash)
+);
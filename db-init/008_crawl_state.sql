@@ -0,0 +1,22 @@
+-- db-init/008_crawl_state.sql
+-- 목적: 증분 크롤링 상태 저장
+--   1) crawl_state  : (카메라, 비디오) 별 high-water mark + 이어받기 page token
+--   2) search_cache : 검색어별 search 결과 캐시 (TTL 은 크롤러에서 판단)
+
+CREATE TABLE IF NOT EXISTS crawl_state (
+    camera_model       TEXT NOT NULL,
+    video_id           TEXT NOT NULL,
+    last_published_at  TIMESTAMPTZ,
+    last_comment_id    TEXT,
+    page_token         TEXT,
+    updated_at         TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (camera_model, video_id)
+);
+
+CREATE TABLE IF NOT EXISTS search_cache (
+    query        TEXT    NOT NULL,
+    max_results  INTEGER NOT NULL,
+    video_ids    TEXT[]  NOT NULL,
+    fetched_at   TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (query, max_results)
+);
@@ -0,0 +1,68 @@
+-- db-init/009_keyword_incremental.sql
+-- 목적: 키워드 통계 증분 갱신
+--   1) review.labeled_at : 감성 라벨 / 카메라 기종이 바뀐 시각 (트리거로 자동 기록)
+--   2) review_keyword_counts    : (카메라, 감성, 키워드) 전체 빈도 (top_k 로 자르지 않음)
+--   3) review_keyword_processed : 리뷰별로 마지막에 어느 (카메라, 감성)에 집계됐는지
+--   4) keyword_stats_state      : 마지막으로 처리한 labeled_at (watermark)
+
+-- 1) labeled_at 컬럼 + 트리거
+ALTER TABLE review
+    ADD COLUMN IF NOT EXISTS labeled_at TIMESTAMP WITHOUT TIME ZONE;
+
+CREATE OR REPLACE FUNCTION touch_review_labeled_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    IF NEW.sentiment_label IS NOT NULL THEN
+      NEW.labeled_at := clock_timestamp();
+    END IF;
+  ELSIF NEW.sentiment_label IS DISTINCT FROM OLD.sentiment_label
+     OR NEW.camera_model IS DISTINCT FROM OLD.camera_model THEN
+    NEW.labeled_at := clock_timestamp();
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_review_labeled_at ON review;
+
+CREATE TRIGGER trg_review_labeled_at
+BEFORE INSERT OR UPDATE ON review
+FOR EACH ROW
+EXECUTE FUNCTION touch_review_labeled_at();
+
+-- 기존에 라벨이 붙어 있던 행은 지금 시각으로 채움
+UPDATE review
+   SET labeled_at = now()
+ WHERE sentiment_label IS NOT NULL
+   AND labeled_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_review_labeled_at ON review (labeled_at);
+
+-- 2) 전체 키워드 빈도
+CREATE TABLE IF NOT EXISTS review_keyword_counts (
+    camera_model     TEXT   NOT NULL,
+    sentiment_label  TEXT   NOT NULL,
+    keyword          TEXT   NOT NULL,
+    freq             BIGINT NOT NULL,
+    PRIMARY KEY (camera_model, sentiment_label, keyword)
+);
+
+-- 3) 리뷰별 집계 위치 (라벨이 바뀌면 이전 그룹에서 빼기 위해 필요)
+CREATE TABLE IF NOT EXISTS review_keyword_processed (
+    review_id        INTEGER PRIMARY KEY,
+    camera_model     TEXT,
+    sentiment_label  TEXT,
+    processed_at     TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- 4) watermark (항상 1행)
+CREATE TABLE IF NOT EXISTS keyword_stats_state (
+    id          SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    watermark   TIMESTAMP WITHOUT TIME ZONE,
+    updated_at  TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
+
+INSERT INTO keyword_stats_state (id, watermark)
+VALUES (1, NULL)
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,18 @@
+-- db-init/010_keyword_tokenizer.sql
+-- 목적: 키워드 토큰화 backend 교체 지원
+--   1) keyword_token_cache : (토큰화 backend, 리뷰 본문 sha256) → 토큰 목록
+--      형태소 분석처럼 비싼 토큰화를 같은 문장에 대해 한 번만 수행
+--   2) keyword_stats_state.tokenizer : 증분 집계가 어떤 토큰화로 누적됐는지 기록
+--      (keyword_token_cache.tokenizer 와 같은 "<backend>:<설정 해시>" 값)
+--      (다른 토큰화로 증분 실행하면 차감 값이 어긋나므로 --rebuild 필요)
+
+CREATE TABLE IF NOT EXISTS keyword_token_cache (
+    tokenizer   TEXT      NOT NULL,
+    text_hash   CHAR(64)  NOT NULL,
+    tokens      TEXT[]    NOT NULL,
+    created_at  TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (tokenizer, text_hash)
+);
+
+ALTER TABLE keyword_stats_state
+    ADD COLUMN IF NOT EXISTS tokenizer TEXT;
@@ -0,0 +1,10 @@
+-- db-init/011_keyword_score.sql
+-- 목적: 키워드 통계에 특징 점수(score) 저장
+--   - analyze_keywords.py --scorer {freq,tfidf,logodds} 로 계산한 값
+--   - freq 는 그대로 두고, 대시보드는 score 순으로 정렬 (기존 행은 NULL)
+
+ALTER TABLE review_keyword_stats
+    ADD COLUMN IF NOT EXISTS score DOUBLE PRECISION;
+
+CREATE INDEX IF NOT EXISTS idx_rks_cam_sent_score
+    ON review_keyword_stats (camera_model, sentiment_label, score DESC);
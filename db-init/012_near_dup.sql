@@ -0,0 +1,46 @@
+-- db-init/012_near_dup.sql
+-- 목적: 복사/붙여넣기 스팸 같은 "거의 같은" 댓글 제거 (MinHash + LSH, datapipe/near_dup.py)
+--   1) review.duplicate_of : 먼저 들어온 원본 review.id (중복이 아니면 NULL)
+--   2) review_minhash      : 리뷰별 MinHash signature (처리 완료 표시 겸용)
+--   3) review_lsh_band     : LSH band bucket → 원본 리뷰 (중복 판정된 행은 넣지 않음)
+--   4) duplicate_of 가 바뀌어도 labeled_at 갱신 → 증분 키워드 집계에서 차감
+
+-- 1) duplicate_of 컬럼
+ALTER TABLE review
+    ADD COLUMN IF NOT EXISTS duplicate_of INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_review_duplicate_of
+    ON review (duplicate_of)
+ WHERE duplicate_of IS NOT NULL;
+
+-- 2) signature (128 x uint32 little-endian = 512 bytes)
+CREATE TABLE IF NOT EXISTS review_minhash (
+    review_id   INTEGER   PRIMARY KEY,
+    signature   BYTEA     NOT NULL,
+    created_at  TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- 3) LSH band bucket
+CREATE TABLE IF NOT EXISTS review_lsh_band (
+    band        SMALLINT  NOT NULL,
+    bucket      BIGINT    NOT NULL,
+    review_id   INTEGER   NOT NULL,
+    PRIMARY KEY (band, bucket, review_id)
+);
+
+-- 4) labeled_at 트리거에 duplicate_of 변경 추가 (009_keyword_incremental.sql 의 함수 교체)
+CREATE OR REPLACE FUNCTION touch_review_labeled_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    IF NEW.sentiment_label IS NOT NULL THEN
+      NEW.labeled_at := clock_timestamp();
+    END IF;
+  ELSIF NEW.sentiment_label IS DISTINCT FROM OLD.sentiment_label
+     OR NEW.camera_model IS DISTINCT FROM OLD.camera_model
+     OR NEW.duplicate_of IS DISTINCT FROM OLD.duplicate_of THEN
+    NEW.labeled_at := clock_timestamp();
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
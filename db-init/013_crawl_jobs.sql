@@ -0,0 +1,27 @@
+-- db-init/013_crawl_jobs.sql
+-- 목적: 카메라별 크롤링 job 스케줄러 (datapipe/crawl_scheduler.py)
+--   1) crawl_job_status   : 배치(batch_id) 안에서 카메라별 job 상태 → 중단된 배치를 이어서 실행
+--   2) youtube_quota_usage : YouTube API quota 사용량 (quota 가 초기화되는 태평양 시간 기준 날짜별)
+
+-- 1) job 상태
+--    status: pending / running / retrying / done / failed / deferred(quota 소진으로 미룸)
+CREATE TABLE IF NOT EXISTS crawl_job_status (
+    batch_id     TEXT      NOT NULL,
+    camera       TEXT      NOT NULL,
+    status       TEXT      NOT NULL DEFAULT 'pending',
+    priority     INTEGER   NOT NULL DEFAULT 0,
+    attempts     INTEGER   NOT NULL DEFAULT 0,
+    inserted     INTEGER   NOT NULL DEFAULT 0,
+    last_error   TEXT,
+    started_at   TIMESTAMP WITHOUT TIME ZONE,
+    finished_at  TIMESTAMP WITHOUT TIME ZONE,
+    updated_at   TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (batch_id, camera)
+);
+
+-- 2) quota 사용량 (search 100, commentThreads 1 단위)
+CREATE TABLE IF NOT EXISTS youtube_quota_usage (
+    day         DATE      PRIMARY KEY,
+    units       BIGINT    NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
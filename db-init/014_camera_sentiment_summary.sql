@@ -0,0 +1,197 @@
+-- db-init/014_camera_sentiment_summary.sql
+-- 목적: 대시보드 통계용 (카메라, 날짜) 별 요약 테이블
+--   1) camera_sentiment_summary : 리뷰 수 / 감성 점수 합계 / 라벨별 개수
+--      → /api/stats/* 와 full_pipeline 요약 출력은 review 전체 GROUP BY 대신 이 테이블만 읽음
+--   2) review 에 INSERT / UPDATE / DELETE 가 있을 때마다 문장(statement) 단위 트리거로 증감 반영
+--      (transition table 로 바뀐 행을 (카메라, 날짜) 별로 모아서 upsert 1번
+--       → 라벨링 COPY + UPDATE ... FROM 처럼 여러 행을 바꿔도 요약 행은 그룹당 1번만 갱신)
+--   3) 처음 적용할 때 기존 review 로 채움 (다시 맞추려면 python camera_summary.py --rebuild)
+--   4) 요약 행은 항상 (camera_model, day) 순서로 잠금
+--      → 여러 카메라/날짜를 건드리는 트랜잭션이 동시에 돌아도 서로 반대 순서로 기다리는 deadlock 이 없음
+--
+-- 키 규칙
+--   - camera_model 이 NULL 인 리뷰는 '' 로 집계
+--   - created_at 이 NULL 인 리뷰는 day = '-infinity'
+
+-- 1) 요약 테이블
+CREATE TABLE IF NOT EXISTS camera_sentiment_summary (
+    camera_model     TEXT    NOT NULL,
+    day              DATE    NOT NULL,
+    review_count     BIGINT  NOT NULL DEFAULT 0,   -- 전체 리뷰 수
+    scored_count     BIGINT  NOT NULL DEFAULT 0,   -- sentiment_score 가 있는 리뷰 수
+    score_sum        NUMERIC NOT NULL DEFAULT 0,   -- sentiment_score 합계 (평균 = score_sum / scored_count)
+    positive_count   BIGINT  NOT NULL DEFAULT 0,
+    neutral_count    BIGINT  NOT NULL DEFAULT 0,
+    negative_count   BIGINT  NOT NULL DEFAULT 0,
+    unlabeled_count  BIGINT  NOT NULL DEFAULT 0,   -- sentiment_label 이 NULL
+    updated_at       TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (camera_model, day)
+);
+
+-- 2) 증감 반영 트리거 (INSERT / UPDATE / DELETE 별로 볼 수 있는 transition table 이 달라서 함수 3개)
+CREATE OR REPLACE FUNCTION camera_summary_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO camera_sentiment_summary AS s (
+      camera_model, day, review_count, scored_count, score_sum,
+      positive_count, neutral_count, negative_count, unlabeled_count, updated_at
+  )
+  SELECT COALESCE(camera_model, ''),
+         COALESCE(created_at::date, '-infinity'::date),
+         count(*),
+         count(sentiment_score),
+         COALESCE(sum(sentiment_score), 0),
+         count(*) FILTER (WHERE sentiment_label = 'positive'),
+         count(*) FILTER (WHERE sentiment_label = 'neutral'),
+         count(*) FILTER (WHERE sentiment_label = 'negative'),
+         count(*) FILTER (WHERE sentiment_label IS NULL),
+         now()
+    FROM new_rows
+   GROUP BY 1, 2
+   ORDER BY 1, 2
+  ON CONFLICT (camera_model, day) DO UPDATE
+     SET review_count    = s.review_count    + EXCLUDED.review_count,
+         scored_count    = s.scored_count    + EXCLUDED.scored_count,
+         score_sum       = s.score_sum       + EXCLUDED.score_sum,
+         positive_count  = s.positive_count  + EXCLUDED.positive_count,
+         neutral_count   = s.neutral_count   + EXCLUDED.neutral_count,
+         negative_count  = s.negative_count  + EXCLUDED.negative_count,
+         unlabeled_count = s.unlabeled_count + EXCLUDED.unlabeled_count,
+         updated_at      = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION camera_summary_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO camera_sentiment_summary AS s (
+      camera_model, day, review_count, scored_count, score_sum,
+      positive_count, neutral_count, negative_count, unlabeled_count, updated_at
+  )
+  SELECT camera_model, day,
+         sum(review_count), sum(scored_count), sum(score_sum),
+         sum(positive_count), sum(neutral_count), sum(negative_count), sum(unlabeled_count),
+         now()
+    FROM (
+          SELECT COALESCE(camera_model, '') AS camera_model,
+                 COALESCE(created_at::date, '-infinity'::date) AS day,
+                 1 AS review_count,
+                 (sentiment_score IS NOT NULL)::int AS scored_count,
+                 COALESCE(sentiment_score, 0) AS score_sum,
+                 (sentiment_label IS NOT DISTINCT FROM 'positive')::int AS positive_count,
+                 (sentiment_label IS NOT DISTINCT FROM 'neutral')::int AS neutral_count,
+                 (sentiment_label IS NOT DISTINCT FROM 'negative')::int AS negative_count,
+                 (sentiment_label IS NULL)::int AS unlabeled_count
+            FROM new_rows
+          UNION ALL
+          SELECT COALESCE(camera_model, ''),
+                 COALESCE(created_at::date, '-infinity'::date),
+                 -1,
+                 -(sentiment_score IS NOT NULL)::int,
+                 -COALESCE(sentiment_score, 0),
+                 -(sentiment_label IS NOT DISTINCT FROM 'positive')::int,
+                 -(sentiment_label IS NOT DISTINCT FROM 'neutral')::int,
+                 -(sentiment_label IS NOT DISTINCT FROM 'negative')::int,
+                 -(sentiment_label IS NULL)::int
+            FROM old_rows
+         ) d
+   GROUP BY camera_model, day
+  -- 라벨과 무관한 UPDATE (duplicate_of, labeled_at 등)는 증감이 0 → 요약 행을 건드리지 않음
+  HAVING sum(review_count) <> 0 OR sum(scored_count) <> 0 OR sum(score_sum) <> 0
+      OR sum(positive_count) <> 0 OR sum(neutral_count) <> 0 OR sum(negative_count) <> 0
+      OR sum(unlabeled_count) <> 0
+   ORDER BY camera_model, day
+  ON CONFLICT (camera_model, day) DO UPDATE
+     SET review_count    = s.review_count    + EXCLUDED.review_count,
+         scored_count    = s.scored_count    + EXCLUDED.scored_count,
+         score_sum       = s.score_sum       + EXCLUDED.score_sum,
+         positive_count  = s.positive_count  + EXCLUDED.positive_count,
+         neutral_count   = s.neutral_count   + EXCLUDED.neutral_count,
+         negative_count  = s.negative_count  + EXCLUDED.negative_count,
+         unlabeled_count = s.unlabeled_count + EXCLUDED.unlabeled_count,
+         updated_at      = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION camera_summary_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- UPDATE ... FROM 은 잠그는 순서를 정할 수 없어서 먼저 키 순서대로 잠금
+  PERFORM 1
+     FROM camera_sentiment_summary s
+    WHERE (s.camera_model, s.day) IN (
+          SELECT COALESCE(camera_model, ''), COALESCE(created_at::date, '-infinity'::date)
+            FROM old_rows
+         )
+    ORDER BY s.camera_model, s.day
+      FOR UPDATE;
+
+  UPDATE camera_sentiment_summary s
+     SET review_count    = s.review_count    - d.review_count,
+         scored_count    = s.scored_count    - d.scored_count,
+         score_sum       = s.score_sum       - d.score_sum,
+         positive_count  = s.positive_count  - d.positive_count,
+         neutral_count   = s.neutral_count   - d.neutral_count,
+         negative_count  = s.negative_count  - d.negative_count,
+         unlabeled_count = s.unlabeled_count - d.unlabeled_count,
+         updated_at      = now()
+    FROM (
+          SELECT COALESCE(camera_model, '') AS camera_model,
+                 COALESCE(created_at::date, '-infinity'::date) AS day,
+                 count(*) AS review_count,
+                 count(sentiment_score) AS scored_count,
+                 COALESCE(sum(sentiment_score), 0) AS score_sum,
+                 count(*) FILTER (WHERE sentiment_label = 'positive') AS positive_count,
+                 count(*) FILTER (WHERE sentiment_label = 'neutral') AS neutral_count,
+                 count(*) FILTER (WHERE sentiment_label = 'negative') AS negative_count,
+                 count(*) FILTER (WHERE sentiment_label IS NULL) AS unlabeled_count
+            FROM old_rows
+           GROUP BY 1, 2
+         ) d
+   WHERE s.camera_model = d.camera_model
+     AND s.day = d.day;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3) 기존 review 로 채우기 (이미 채워져 있으면 건너뜀)
+INSERT INTO camera_sentiment_summary (
+    camera_model, day, review_count, scored_count, score_sum,
+    positive_count, neutral_count, negative_count, unlabeled_count
+)
+SELECT COALESCE(camera_model, ''),
+       COALESCE(created_at::date, '-infinity'::date),
+       count(*),
+       count(sentiment_score),
+       COALESCE(sum(sentiment_score), 0),
+       count(*) FILTER (WHERE sentiment_label = 'positive'),
+       count(*) FILTER (WHERE sentiment_label = 'neutral'),
+       count(*) FILTER (WHERE sentiment_label = 'negative'),
+       count(*) FILTER (WHERE sentiment_label IS NULL)
+  FROM review
+ WHERE NOT EXISTS (SELECT 1 FROM camera_sentiment_summary)
+ GROUP BY 1, 2;
+
+DROP TRIGGER IF EXISTS trg_review_summary_insert ON review;
+DROP TRIGGER IF EXISTS trg_review_summary_update ON review;
+DROP TRIGGER IF EXISTS trg_review_summary_delete ON review;
+
+CREATE TRIGGER trg_review_summary_insert
+AFTER INSERT ON review
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION camera_summary_on_insert();
+
+CREATE TRIGGER trg_review_summary_update
+AFTER UPDATE ON review
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION camera_summary_on_update();
+
+CREATE TRIGGER trg_review_summary_delete
+AFTER DELETE ON review
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION camera_summary_on_delete();
@@ -0,0 +1,279 @@
+-- db-init/015_review_partitioning.sql
+-- 목적: review 를 수집 시각(ingested_at) 월 단위 range 파티션 테이블로 전환
+--   1) review.ingested_at : 행이 INSERT 된 시각 (created_at 은 댓글 작성 시각이라 오래된 영상의 새 댓글도 과거 달)
+--      review_yYYYYmMM 월별 파티션 + review_default (범위 밖)
+--      → 새로 들어온 리뷰는 항상 이번 달 파티션
+--      → 최근 N개월에 수집된 리뷰만 읽는 쿼리는 오래된 파티션을 건너뜀
+--        (label_with_model / analyze_keywords --recent-months)
+--      → vacuum / 인덱스 유지보수도 파티션 단위
+--   2) ensure_review_partitions() : 앞으로 쓸 월 파티션을 미리 생성 (review_partitions.py 가 크롤링 전에 호출)
+--   3) review_content_key : (source, content) 중복 방지
+--      파티션 테이블의 UNIQUE 는 파티션 키(ingested_at)를 포함해야 해서
+--      기존 UNIQUE (source, content) 를 그대로 둘 수 없음 → 별도 키 테이블 + BEFORE INSERT 트리거로 같은 동작
+--      (이미 있는 키면 INSERT 를 건너뜀 = 기존 ON CONFLICT DO NOTHING 과 동일하게 RETURNING 에 안 나옴)
+--      UPDATE 로 source / content 가 바뀌면 BEFORE UPDATE 트리거가 키를 옮김
+--      (새 키가 이미 있으면 기존 UNIQUE 처럼 unique_violation)
+--   4) 기존 트리거 (004 / 009·012 / 014) 를 새 테이블에 다시 연결
+--
+-- 주의
+--   - PRIMARY KEY 는 (id, ingested_at). id 는 기존 sequence 를 그대로 이어서 사용
+--   - 기존 행은 수집 시각이 없으므로 COALESCE(created_at, labeled_at) 로 채움 (둘 다 없으면 '-infinity' → review_default)
+--   - 이미 파티션 테이블이면 전환 단계는 건너뜀
+
+-- 1) 월 파티션 생성 함수
+--    default 파티션에 이미 들어가 있는 그 달의 행은 새 파티션으로 옮긴 뒤 attach
+--    (partition 에 직접 하는 DELETE 라서 review 의 문장 단위 트리거(요약 / 키 해제)는 실행되지 않음)
+CREATE OR REPLACE FUNCTION ensure_review_partitions(
+    months_ahead INTEGER DEFAULT 3,
+    start_month  DATE    DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+  m        DATE := date_trunc('month', COALESCE(start_month, now()::date))::date;
+  last_m   DATE := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+  next_m   DATE;
+  part     TEXT;
+  created  INTEGER := 0;
+BEGIN
+  WHILE m <= last_m LOOP
+    next_m := (m + interval '1 month')::date;
+    part := 'review_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM');
+
+    IF to_regclass(part) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE review INCLUDING DEFAULTS)', part);
+      EXECUTE format(
+        'WITH moved AS (
+             DELETE FROM review_default
+              WHERE ingested_at >= %L AND ingested_at < %L
+          RETURNING *
+         )
+         INSERT INTO %I SELECT * FROM moved',
+        m, next_m, part
+      );
+      EXECUTE format(
+        'ALTER TABLE review ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        part, m, next_m
+      );
+      created := created + 1;
+    END IF;
+
+    m := next_m;
+  END LOOP;
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2) (source, content) 키 테이블
+--    content 는 길이 제한이 없어서 md5 로 저장 (btree 인덱스 행 크기 제한)
+CREATE TABLE IF NOT EXISTS review_content_key (
+    source       TEXT     NOT NULL,
+    content_md5  UUID     NOT NULL,
+    review_id    INTEGER  NOT NULL,
+    PRIMARY KEY (source, content_md5)
+);
+
+CREATE INDEX IF NOT EXISTS idx_review_content_key_review
+    ON review_content_key (review_id);
+
+-- 3) heap → 파티션 테이블 전환
+DO $$
+DECLARE
+  seq  TEXT;
+BEGIN
+  IF (SELECT c.relkind FROM pg_class c WHERE c.oid = 'review'::regclass) <> 'r' THEN
+    RETURN;
+  END IF;
+
+  -- 옛 테이블을 지워도 id sequence 는 남도록 소유 관계 해제
+  seq := pg_get_serial_sequence('review', 'id');
+  EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', seq);
+
+  ALTER TABLE review RENAME TO review_legacy;
+
+  CREATE TABLE review (
+    id               INTEGER       NOT NULL,
+    source           TEXT,
+    rating           NUMERIC(2,1),
+    content          TEXT          NOT NULL,
+    created_at       TIMESTAMP     DEFAULT NOW(),
+    sentiment_label  VARCHAR(16),
+    sentiment_score  NUMERIC(4,3),
+    sentiment_model  TEXT,
+    camera_model     VARCHAR(100),
+    labeled_at       TIMESTAMP WITHOUT TIME ZONE,
+    duplicate_of     INTEGER,
+    ingested_at      TIMESTAMP     NOT NULL DEFAULT NOW()
+  ) PARTITION BY RANGE (ingested_at);
+
+  CREATE TABLE review_default PARTITION OF review DEFAULT;
+
+  -- 기존 데이터가 있는 달부터 3개월 뒤까지
+  PERFORM ensure_review_partitions(
+    3,
+    (SELECT min(COALESCE(created_at, labeled_at))::date
+       FROM review_legacy
+      WHERE isfinite(COALESCE(created_at, labeled_at)))
+  );
+
+  -- 트리거를 붙이기 전에 복사 → labeled_at / 요약 테이블 / reject_null 에 영향 없음
+  INSERT INTO review (
+      id, source, rating, content, created_at,
+      sentiment_label, sentiment_score, sentiment_model, camera_model,
+      labeled_at, duplicate_of, ingested_at
+  )
+  SELECT id, source, rating, content, created_at,
+         sentiment_label, sentiment_score, sentiment_model, camera_model,
+         labeled_at, duplicate_of, COALESCE(created_at, labeled_at, '-infinity')
+    FROM review_legacy;
+
+  INSERT INTO review_content_key (source, content_md5, review_id)
+  SELECT source, md5(content)::uuid, id
+    FROM review
+   WHERE source IS NOT NULL
+   ORDER BY id
+  ON CONFLICT DO NOTHING;
+
+  DROP TABLE review_legacy;
+
+  EXECUTE format('ALTER TABLE review ALTER COLUMN id SET DEFAULT nextval(%L::regclass)', seq);
+  EXECUTE format('ALTER SEQUENCE %s OWNED BY review.id', seq);
+
+  -- 파티션 키를 포함해야 하므로 (id, ingested_at)
+  ALTER TABLE review ADD PRIMARY KEY (id, ingested_at);
+END;
+$$;
+
+-- 4) 인덱스 (파티션 테이블에 만들면 파티션마다 자동 생성)
+CREATE INDEX IF NOT EXISTS idx_review_created_at ON review (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_review_sentiment ON review (sentiment_label);
+CREATE INDEX IF NOT EXISTS idx_review_labeled_at ON review (labeled_at);
+
+CREATE INDEX IF NOT EXISTS idx_review_unlabeled
+    ON review (id)
+ WHERE sentiment_model IS NULL OR sentiment_model = '';
+
+CREATE INDEX IF NOT EXISTS idx_review_duplicate_of
+    ON review (duplicate_of)
+ WHERE duplicate_of IS NOT NULL;
+
+-- 5) (source, content) 중복 방지 트리거
+--    source 가 NULL 인 행은 기존 UNIQUE 처럼 중복으로 보지 않음
+--    (동시에 같은 키를 INSERT 하면 키 테이블의 PK 에서 먼저 들어온 쪽 커밋을 기다렸다가 건너뜀)
+--    ingested_at 이 바뀌어 다른 파티션으로 옮겨지는 UPDATE 도 파티션에는 INSERT 로 보이므로
+--    같은 review_id 가 잡고 있는 키는 자기 것으로 보고 통과
+CREATE OR REPLACE FUNCTION claim_review_content_key()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.source IS NULL THEN
+    RETURN NEW;
+  END IF;
+
+  INSERT INTO review_content_key (source, content_md5, review_id)
+  VALUES (NEW.source, md5(NEW.content)::uuid, NEW.id)
+  ON CONFLICT (source, content_md5) DO UPDATE
+     SET review_id = EXCLUDED.review_id
+   WHERE review_content_key.review_id = EXCLUDED.review_id;
+
+  IF NOT FOUND THEN
+    RETURN NULL; -- 이미 있는 (source, content) → INSERT 스킵
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- source / content 를 바꾸는 UPDATE : 이전 키를 풀고 새 키를 잡음
+--    새 키를 다른 리뷰가 이미 잡고 있으면 INSERT 처럼 조용히 건너뛰지 않고 에러
+--    (UPDATE 를 건너뛰면 호출한 쪽은 바뀐 줄 알게 됨)
+CREATE OR REPLACE FUNCTION move_review_content_key()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF (OLD.source, md5(OLD.content)) IS NOT DISTINCT FROM (NEW.source, md5(NEW.content)) THEN
+    RETURN NEW;
+  END IF;
+
+  DELETE FROM review_content_key
+   WHERE review_id = OLD.id;
+
+  IF NEW.source IS NULL THEN
+    RETURN NEW;
+  END IF;
+
+  INSERT INTO review_content_key (source, content_md5, review_id)
+  VALUES (NEW.source, md5(NEW.content)::uuid, NEW.id)
+  ON CONFLICT DO NOTHING;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'review (source, content) 중복: source=%, review_id=%', NEW.source, NEW.id
+      USING ERRCODE = 'unique_violation';
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 리뷰를 지우면 키도 해제 (같은 댓글을 다시 수집할 수 있도록)
+CREATE OR REPLACE FUNCTION release_review_content_key()
+RETURNS TRIGGER AS $$
+BEGIN
+  DELETE FROM review_content_key k
+   USING old_rows o
+   WHERE k.review_id = o.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6) 트리거 연결
+--    BEFORE 트리거는 이름 순으로 실행: trg_reject_null → trg_review_content_key → trg_review_labeled_at
+--    (빈 리뷰로 걸러지는 행은 키를 잡지 않음)
+--    UPDATE 는 trg_review_content_key_move → trg_review_labeled_at
+DROP TRIGGER IF EXISTS trg_reject_null ON review;
+DROP TRIGGER IF EXISTS trg_review_content_key ON review;
+DROP TRIGGER IF EXISTS trg_review_content_key_move ON review;
+DROP TRIGGER IF EXISTS trg_review_content_key_release ON review;
+DROP TRIGGER IF EXISTS trg_review_labeled_at ON review;
+DROP TRIGGER IF EXISTS trg_review_summary_insert ON review;
+DROP TRIGGER IF EXISTS trg_review_summary_update ON review;
+DROP TRIGGER IF EXISTS trg_review_summary_delete ON review;
+
+CREATE TRIGGER trg_reject_null
+BEFORE INSERT ON review
+FOR EACH ROW
+EXECUTE FUNCTION reject_null_reviews();
+
+CREATE TRIGGER trg_review_content_key
+BEFORE INSERT ON review
+FOR EACH ROW
+EXECUTE FUNCTION claim_review_content_key();
+
+CREATE TRIGGER trg_review_content_key_move
+BEFORE UPDATE OF source, content ON review
+FOR EACH ROW
+EXECUTE FUNCTION move_review_content_key();
+
+CREATE TRIGGER trg_review_labeled_at
+BEFORE INSERT OR UPDATE ON review
+FOR EACH ROW
+EXECUTE FUNCTION touch_review_labeled_at();
+
+CREATE TRIGGER trg_review_content_key_release
+AFTER DELETE ON review
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION release_review_content_key();
+
+CREATE TRIGGER trg_review_summary_insert
+AFTER INSERT ON review
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION camera_summary_on_insert();
+
+CREATE TRIGGER trg_review_summary_update
+AFTER UPDATE ON review
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION camera_summary_on_update();
+
+CREATE TRIGGER trg_review_summary_delete
+AFTER DELETE ON review
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION camera_summary_on_delete();
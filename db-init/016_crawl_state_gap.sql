@@ -0,0 +1,9 @@
+-- db-init/016_crawl_state_gap.sql
+-- 목적: 새 댓글이 비디오당 수집 한도보다 많을 때 못 받은 구간(gap) 기록
+--   - delta 가 max_comments 에서 멈추면 page_token 은 그 다음 위치, 구간의 끝은 이전 high-water mark
+--   - 기존 backfill 위치는 older_page_token 으로 보존 (gap 을 다 받은 뒤 이어서)
+
+ALTER TABLE crawl_state
+    ADD COLUMN IF NOT EXISTS stop_published_at  TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS stop_comment_id    TEXT,
+    ADD COLUMN IF NOT EXISTS older_page_token   TEXT;